@@ -35,6 +35,10 @@ class ExtractRoleMetadataConfig(MainConfig):
     """Configuration for role metadata extraction."""
 
     count: Option[int] = Option('Top number of roles to keep', required=False)
+    schema_sample: Option[float] = Option(
+            'Fraction of scraped API objects to verify against the expected '
+            'schema', default=1.0, click_type=click.FloatRange(0.0, 1.0),
+            converter=float)
 
 
 class CloneConfig(MainConfig):
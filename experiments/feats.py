@@ -1,10 +1,14 @@
-#import seaborn as sb
 import csv
+import re
+
+import numpy as np
 
 p = "/Users/ruben/Documents/PhD/SECO-Assist/reproduction_package/random-forest/data/features.csv"
 
-with open(p) as f:
-    feats = list(csv.reader(f.readlines()))[1:]
+with open(p, newline='', buffering=1 << 20) as f:
+    feats_reader = csv.reader(f)
+    next(feats_reader)  # Header
+    feats = list(feats_reader)
 
 COLS = {
     'Addition': 0,
@@ -12,58 +16,52 @@ COLS = {
     'Edit': 2,
     'Relocation': 3
 }
+SUFFIX_RE = re.compile(r'(.*?)(' + '|'.join(COLS) + r')$')
+
+feat_names, ranks, importances = np.array(feats).T
+selected = ranks == '1'
+has_importance = importances != ''
 
-ROWS = {}
+signs = np.zeros(len(feats))
+signs[has_importance] = importances[has_importance].astype(float)
 
-max_unselect = 0.0
-min_select = 1.0
-for feat in feats:
-    sign = float(feat[2]) if feat[2] else 0.0
-    feat.append(sign)
-    select = feat[1] == '1'
-    if select:
-        min_select = min(min_select, sign)
-    else:
-        max_unselect = max(max_unselect, sign)
+max_unselect = signs[~selected].max(initial=0.0)
+min_select = signs[selected].min(initial=1.0)
 
 avg = (max_unselect + min_select) / 2
-for feat in feats:
-    feat[3] -= avg
+signs -= avg
 
-smax = max(feat[3] for feat in feats)
-smin = min(feat[3] for feat in feats)
+smax = signs.max()
+smin = signs.min()
 
 pos_rescale = 1 / smax
 neg_rescale = -1 / smin
 
-significances = [[], [], [], []]
-vals = [[], [], [], []]
+# Split each feature name into its component and change kind in one match
+comp_names, chg_kinds = zip(*(
+        SUFFIX_RE.match(feat_name).groups() for feat_name in feat_names))
+col_nrs = np.array([COLS[chg_kind] for chg_kind in chg_kinds])
 
-for (feat_name, rank, importance, sign) in feats:
-    chg_kind = next(chg_kind for chg_kind in COLS.keys() if feat_name.endswith(chg_kind))
-    comp_name = feat_name[:len(feat_name) - len(chg_kind)]
-    col_nr = COLS[chg_kind]
-    if comp_name in ROWS:
-        row_nr = ROWS[comp_name]
-    else:
-        row_nr = len(ROWS)
-        ROWS[comp_name] = row_nr
-        for col in significances:
-            col.extend([0] * (row_nr - len(col) + 1))
-        for col in vals:
-            col.extend(['N/A'] * (row_nr - len(col) + 1))
+# Number the components in order of first appearance, so that the grids can
+# be allocated at their final size.
+ROWS = {comp_name: row_nr for row_nr, comp_name in enumerate(
+        dict.fromkeys(comp_names))}
+row_nrs = np.array([ROWS[comp_name] for comp_name in comp_names])
 
-    vals[col_nr][row_nr] = importance if importance else 'N/A'
-    significances[col_nr][row_nr] = sign * (pos_rescale if rank == '1' else neg_rescale)
+significances = np.zeros((len(COLS), len(ROWS)))
+significances[col_nrs, row_nrs] = signs * np.where(
+        selected, pos_rescale, neg_rescale)
+
+vals = np.full((len(COLS), len(ROWS)), 'N/A', dtype=object)
+vals[col_nrs, row_nrs] = np.where(has_importance, importances, 'N/A')
 
 
 print(significances)
 
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sb
 
-#plot = sb.heatmap(np.array(significances).transpose(), cmap=sb.diverging_palette(12, 128, s=100, n=15), annot=np.array(vals).transpose(), fmt='',
+#plot = sb.heatmap(np.array(significances).transpose(), cmap=sb.diverging_palette(12, 128, s=100, n=15), annot=np.array(vals).transpose(), fmt='', rasterized=True,
 #        xticklabels=[x[0] for x in sorted(COLS.items(), key=lambda x: x[1])],
 #        yticklabels=[x[0] for x in sorted(ROWS.items(), key=lambda x: x[1])], cbar=False)
 # plt.show()
@@ -73,9 +71,11 @@ cm = np.array([[46233, 1472, 31], [9894, 3866, 40], [1974, 684, 357]])
 cmn = cm.astype('float') / cm.sum(axis=0)
 print(cmn)
 sb.set(font_scale=1.5)
-plot = sb.heatmap(cmn, annot=cm, fmt='', cmap='Greens',
+# Rasterize the heatmap cells, the PDF would otherwise contain a vector quad
+# mesh. Annotations and labels remain vector text.
+plot = sb.heatmap(cmn, annot=cm, fmt='', cmap='Greens', rasterized=True,
     xticklabels=['patch*', 'minor*', 'major*'], yticklabels=['patch', 'minor', 'major'])
 plot.set_yticklabels(plot.get_yticklabels(), rotation=0)
 plot.set_xlabel('Predicted')
 plot.set_ylabel('Actual')
-plt.savefig("foo.pdf", bbox_inches='tight')
+plt.savefig("foo.pdf", bbox_inches='tight', dpi=300)
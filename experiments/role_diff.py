@@ -1,10 +1,9 @@
 """Experiments with role diffing."""
-from typing import Any
+from typing import Dict, Union
 
 import sys
 
 from pathlib import Path
-from shutil import copytree
 from tempfile import TemporaryDirectory
 
 from git import Git, Repo
@@ -18,16 +17,15 @@ if __name__ != '__main__':
 
 role_dir = Path(sys.argv[1]).resolve()
 role_name = role_dir.name
-role_base_dir = role_dir.parent
 
 
-def diff_it(role_dir: Path, rev1: str, rev2: str) -> Any:
-    g = Git(role_dir)
-    g.checkout(rev1)
-    role_v1 = Role.load(role_tmp_dir, role_base_dir)
-    g.checkout(rev2)
-    role_v2 = Role.load(role_tmp_dir, role_base_dir)
-    return [d for d in role_v1.diff(role_v2) if d]
+def load_rev(g: Git, worktree_dir: Path, rev: str) -> Union[Role, AnsibleError]:
+    role_tmp_dir = worktree_dir / role_name
+    g.worktree('add', '--detach', str(role_tmp_dir), rev)
+    try:
+        return Role.load_from_ans_obj(role_tmp_dir)
+    except AnsibleError as exc:
+        return exc
 
 
 if sys.argv[2] == 'all':
@@ -35,19 +33,32 @@ if sys.argv[2] == 'all':
 else:
     revs = sys.argv[2:]
 
-with TemporaryDirectory() as tmpd:
-    role_tmp_dir = Path(tmpd) / role_name
-    copytree(role_dir, role_tmp_dir, symlinks=True)
-    for rev2, rev1 in zip(revs, revs[1:]):
-        header = f'{rev1} -> {rev2}'
-        print(header)
-        print('=' * len(header))
-        print()
-        try:
-            diffs = diff_it(role_tmp_dir, rev1, rev2)
-            for diff in sorted(diffs, key=lambda d: d.object_id):
-                print(diff)
-                print()
-        except AnsibleError as exc:
-            print(exc)
-        print()
+# Check out each revision in its own worktree so that every revision is only
+# checked out and parsed once, rather than twice per adjacent pair. Roles are
+# loaded sequentially: loading redirects the process-wide stdout/stderr and
+# Ansible's loaders aren't thread-safe.
+g = Git(role_dir)
+roles: Dict[str, Union[Role, AnsibleError]] = {}
+try:
+    with TemporaryDirectory() as tmpd:
+        for rev_i, rev in enumerate(dict.fromkeys(revs)):
+            roles[rev] = load_rev(g, Path(tmpd) / str(rev_i), rev)
+finally:
+    g.worktree('prune')
+
+for rev2, rev1 in zip(revs, revs[1:]):
+    header = f'{rev1} -> {rev2}'
+    print(header)
+    print('=' * len(header))
+    print()
+    role_v1, role_v2 = roles[rev1], roles[rev2]
+    if isinstance(role_v1, AnsibleError):
+        print(role_v1)
+    elif isinstance(role_v2, AnsibleError):
+        print(role_v2)
+    else:
+        diffs = [d for d in role_v1.diff(role_v2) if d]
+        for diff in sorted(diffs, key=lambda d: d.object_id):
+            print(diff)
+            print()
+    print()
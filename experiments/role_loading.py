@@ -0,0 +1,19 @@
+"""Shared role loading for the experiment scripts."""
+import functools
+
+from pathlib import Path
+
+from models.structural.role import Role
+
+
+@functools.lru_cache(maxsize=32)
+def _load_role(role_dir: Path) -> Role:
+    return Role.load_from_ans_obj(role_dir)
+
+
+def load_role(role_dir: Path) -> Role:
+    """Load a role, reusing the parsed role when it was loaded before.
+
+    Avoids reparsing the same role when experiments are rerun in a REPL.
+    """
+    return _load_role(role_dir.resolve())
@@ -6,11 +6,11 @@ import sys
 
 from pathlib import Path
 
+from experiments.role_loading import load_role
 from models.structural.role import (
         Block,
         HandlerBlock,
         HandlerTask,
-        Role,
         Task,
 )
 
@@ -22,7 +22,7 @@ role_dir = Path(sys.argv[1]).resolve()
 role_name = role_dir.name
 role_base_dir = role_dir.parent
 
-r = Role.load(role_dir, role_base_dir)
+r = load_role(role_dir)
 
 mf = r.meta_file
 cf = r.constants_files[0]
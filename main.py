@@ -2,9 +2,6 @@
 
 from click import BadParameter
 
-import pipeline
-import pipeline.base
-
 from config import MainConfig
 from util.cli import register_command, register_subcommand
 # from migrations import perform_migrations
@@ -23,9 +20,18 @@ def main(config: MainConfig) -> None:
         pass
 
 
-# Register all commands as stages
-for stage_type, config_type in pipeline.base.STAGES.items():
-    register_subcommand(main, config_type, stage_type)
+def _register_stages() -> None:
+    """Register all pipeline stages as subcommands.
+
+    The pipeline is imported lazily so that importing this module doesn't
+    pull in the full stage graph and its dependencies.
+    """
+    import pipeline
+    import pipeline.base
+
+    for stage_type, config_type in pipeline.base.STAGES.items():
+        register_subcommand(main, config_type, stage_type)
+
 
 # TODO(ROpdebee): Would be cool to include a requires=... kw in the command
 #                 decorator so that the user doesn't have to type out a very
@@ -46,4 +52,5 @@ for stage_type, config_type in pipeline.base.STAGES.items():
 
 
 if __name__ == '__main__':  # pragma: no branch
+    _register_stages()
     main(obj=None)
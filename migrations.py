@@ -1,41 +1,68 @@
 # Dataset migrations
-from typing import Callable, Dict, List, Sequence
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
-import inspect
-import json
-import re
+import os
 import shutil
 import sys
 
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from tqdm import tqdm
 
 from services.galaxy import GalaxyAPI
-from models.serialize import CONVERTER
+from models.serialize import CONVERTER, json_dumps, json_loads
 from models.galaxy import GalaxyRole
 from models.git import GitRepoPath
 
-_MigrationFunc = Callable[[Path], bool]
+_MigrationFunc = Callable[[Path, 'MigrationContext'], bool]
+
+_MIGRATIONS: List[Tuple[int, _MigrationFunc]] = []
 
 
 _VERSION_FILE_NAME = 'version.json'
 
+# FICLONE ioctl request number, from linux/fs.h
+_FICLONE = 0x40049409
+
 
 class MigrationException(Exception):
     """Raised when a migration fails."""
     pass
 
 
+class MigrationContext:
+    """Dataset state shared between the migrations of a single run."""
+
+    def __init__(self, dataset_path: Path) -> None:
+        """Initialize the context for a dataset."""
+        self._roles_path = dataset_path / 'roles.json'
+        self._roles: Optional[Dict[str, GalaxyRole]] = None
+
+    @property
+    def roles(self) -> Dict[str, GalaxyRole]:
+        """Get the roles of the dataset, loaded on first access."""
+        if self._roles is None:
+            self._roles = CONVERTER.structure(
+                    json_loads(self._roles_path.read_bytes()),
+                    Dict[str, GalaxyRole])
+        return self._roles
+
+    @roles.setter
+    def roles(self, roles: Dict[str, GalaxyRole]) -> None:
+        """Replace the roles after a migration has rewritten them."""
+        self._roles = roles
+
+
 def _log(s: str) -> None:
     tqdm.write(s)
 
 
 def _get_dataset_version(dataset_path: Path) -> int:
     try:
-        content = (dataset_path / _VERSION_FILE_NAME).read_text()
-        v = json.loads(content)['version']
+        content = (dataset_path / _VERSION_FILE_NAME).read_bytes()
+        v = json_loads(content)['version']
         if not isinstance(v, int):
             return 0
         return v
@@ -44,29 +71,32 @@ def _get_dataset_version(dataset_path: Path) -> int:
 
 
 def _set_dataset_version(dataset_path: Path, version: int) -> None:
-    v_dict = {'version': version}
-    json_content = json.dumps(v_dict)
+    json_content = json_dumps({'version': version})
     try:
-        (dataset_path / _VERSION_FILE_NAME).write_text(json_content)
+        (dataset_path / _VERSION_FILE_NAME).write_bytes(json_content)
     except OSError as exc:
         raise MigrationException('Failed to write version') from exc
 
 
 def perform_migrations(dataset_path: Path) -> None:
-    migrations = _get_migrations(dataset_path)
+    # Up-to-date datasets are the common case, check those before sorting
+    # the migrations.
     current_v = _get_dataset_version(dataset_path)
-    todo_migrations = migrations[current_v:]
-    if not todo_migrations:
+    if current_v >= len(_MIGRATIONS):
         return
 
+    migrations = _get_migrations(dataset_path)
+    todo_migrations = migrations[current_v:]
+
     _log('Dataset is outdated, '
          f'performing {len(todo_migrations)} migrations')
 
     # Do migrations
     migrations_it = tqdm(
             todo_migrations, unit=' migrations', desc='Performing migrations')
+    ctx = MigrationContext(dataset_path)
     for migration_i, migration_func in enumerate(migrations_it):
-        if not migration_func(dataset_path):
+        if not migration_func(dataset_path, ctx):
             migration_name = migration_func.__name__
             raise MigrationException(f'Failed migration to {migration_name}')
 
@@ -76,31 +106,19 @@ def perform_migrations(dataset_path: Path) -> None:
 
 
 def _get_migrations(dataset_path: Path) -> Sequence[_MigrationFunc]:
-    members = inspect.getmembers(sys.modules[__name__])
-    migration_funcs = {
-            _get_migration_func_version(name): f
-            for name, f in members
-            if inspect.isfunction(f) and _is_migration_func_name(name)}
-    return [
-            f
-            for name, f in sorted(migration_funcs.items(), key=lambda p: p[0])]
-
-
-def _is_migration_func_name(name: str) -> bool:
-    if not name:
-        return False
+    return [f for _, f in sorted(_MIGRATIONS, key=lambda p: p[0])]
 
-    prefix = name.split('_')[0]
-    return bool(re.match(r'v\d+', prefix))
 
+def migration(version: int) -> Callable[[_MigrationFunc], _MigrationFunc]:
+    """Register a migration function to upgrade to the given version."""
+    def decorator(f: _MigrationFunc) -> _MigrationFunc:
+        _MIGRATIONS.append((version, f))
+        return f
+    return decorator
 
-def _get_migration_func_version(name: str) -> int:
-    m = re.match(r'v(\d+)', name)
-    assert m
-    return int(m.group(1))
 
-
-def v1_dataset_version(p: Path) -> bool:
+@migration(version=1)
+def v1_dataset_version(p: Path, ctx: MigrationContext) -> bool:
     """Add the dataset version."""
     # File will be added automatically after version migration
     return True
@@ -112,18 +130,12 @@ def _clean_repo_name(name: str) -> str:
             if part not in ('ansible', 'role'))
 
 
-def _deep_match(role: GalaxyRole, role_json: Dict[str, str]) -> bool:
-    return (role.name == role_json['name']
-            and role.github_user == role_json['github_user']
-            and (role.github_repo == role_json['github_repo']
-                 or (_clean_repo_name(role.github_repo)
-                     == _clean_repo_name(role_json['github_repo']))))
-
-
-def v2_role_namespaces(p: Path) -> bool:  # noqa: C901
+@migration(version=2)
+def v2_role_namespaces(  # noqa: C901
+        p: Path, ctx: MigrationContext
+) -> bool:
     """Add namespaces to Galaxy roles."""
-    with (p / 'roles.json').open('r') as json_roles_f:
-        orig_roles = json.load(json_roles_f)
+    orig_roles = json_loads((p / 'roles.json').read_bytes())
     roles = dict(orig_roles)  # Copy
     galaxy_api = GalaxyAPI()
     # Include deprecated roles in the results: Some of the roles we gathered
@@ -131,8 +143,15 @@ def v2_role_namespaces(p: Path) -> bool:  # noqa: C901
     galaxy_it = galaxy_api.search_roles(deprecated=None)
     todo_role_ids = set(roles.keys())
 
-    unmatched: List[GalaxyRole] = []
-    for galaxy_role in tqdm(galaxy_it, unit=' roles', desc='Update roles'):
+    # Roles whose ID has changed are matched heuristically later on. The GitHub
+    # user and role name need to match exactly, so bucket the unmatched roles
+    # on those and only keep the ones of GitHub users in the dataset. Clean
+    # their repo names only once.
+    dataset_users = {role['github_user'] for role in roles.values()}
+    unmatched_by_key: Dict[Tuple[str, str], List[Tuple[GalaxyRole, str]]]
+    unmatched_by_key = defaultdict(list)
+    for galaxy_role in tqdm(
+            galaxy_it, unit=' roles', desc='Update roles', miniters=1000):
         try:
             roles[galaxy_role.id]['namespace'] = galaxy_role.namespace
             todo_role_ids.remove(galaxy_role.id)
@@ -141,16 +160,24 @@ def v2_role_namespaces(p: Path) -> bool:  # noqa: C901
                 break
         except KeyError:
             # OK, new role not in dataset
-            unmatched.append(galaxy_role)
+            if galaxy_role.github_user in dataset_users:
+                unmatched_key = (galaxy_role.github_user, galaxy_role.name)
+                unmatched_by_key[unmatched_key].append((
+                        galaxy_role,
+                        _clean_repo_name(galaxy_role.github_repo)))
 
     # Perform a deep comparison (heuristically) of any roles whose ID has
     # changed
-    for role_id in list(todo_role_ids):
+    for role_id in frozenset(todo_role_ids):
         missing_role = roles[role_id]
-        candidates: List[GalaxyRole] = []
-        for new_role in unmatched:
-            if (_deep_match(new_role, missing_role)):
-                candidates.append(new_role)
+        missing_repo = missing_role['github_repo']
+        clean_missing_repo = _clean_repo_name(missing_repo)
+        candidates = [
+                new_role
+                for new_role, clean_repo in unmatched_by_key.get(
+                    (missing_role['github_user'], missing_role['name']), [])
+                if (new_role.github_repo == missing_repo
+                    or clean_repo == clean_missing_repo)]
         if not candidates:
             continue
         if len(candidates) > 1:
@@ -169,28 +196,49 @@ def v2_role_namespaces(p: Path) -> bool:  # noqa: C901
     if len(orig_roles) != len(roles):
         raise MigrationException('Lengths of updated roles not equal')
     try:
-        for role_id, updated_role in roles.items():
-            m = CONVERTER.structure(updated_role, GalaxyRole)
-            assert m.id == role_id
+        structured_roles = CONVERTER.structure(roles, Dict[str, GalaxyRole])
     except Exception as exc:
         raise MigrationException('Failed to structure role') from exc
+    if any(m.id != role_id for role_id, m in structured_roles.items()):
+        raise MigrationException('Failed to structure role')
 
-    # Verification passed, write new file
-    with (p / 'roles.json').open('w') as json_roles_f:
-        json.dump(roles, json_roles_f, indent=4, sort_keys=True)
+    # Verification passed, write new file. Later migrations can reuse the
+    # verified roles rather than reloading them.
+    (p / 'roles.json').write_bytes(json_dumps(roles, pretty=True))
+    ctx.roles = structured_roles
 
     return True
 
 
-def v3_repo_directory_role_names(p: Path) -> bool:  # noqa: C901
+def _reflink_copy(src: str, dst: str, *, follow_symlinks: bool = True) -> str:
+    """Copy a file as a copy-on-write clone if the file system supports it.
+
+    Falls back to a regular copy otherwise.
+    """
+    if sys.platform.startswith('linux') and (
+            follow_symlinks or not os.path.islink(src)):
+        import fcntl
+        try:
+            with open(src, 'rb') as f_src, open(dst, 'wb') as f_dst:
+                fcntl.ioctl(f_dst.fileno(), _FICLONE, f_src.fileno())
+        except OSError:
+            pass
+        else:
+            shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
+            return dst
+    return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+
+
+@migration(version=3)
+def v3_repo_directory_role_names(  # noqa: C901
+        p: Path, ctx: MigrationContext
+) -> bool:
     """Restructure repo directories to Galaxy identifiers."""
-    with (p / 'roles.json').open('r') as json_roles_f:
-        roles = CONVERTER.structure(
-                json.load(json_roles_f), Dict[str, GalaxyRole])
+    roles = ctx.roles
 
-    with (p / 'repo_paths.json').open('r') as json_paths_f:
-        repo_paths = CONVERTER.structure(
-                json.load(json_paths_f), Dict[str, GitRepoPath])
+    repo_paths = CONVERTER.structure(
+            json_loads((p / 'repo_paths.json').read_bytes()),
+            Dict[str, GitRepoPath])
 
     (p / 'repos_moved').mkdir(exist_ok=True)
 
@@ -203,6 +251,9 @@ def v3_repo_directory_role_names(p: Path) -> bool:  # noqa: C901
         dest = p / 'repos_moved' / f'{role.namespace}.{role.name}'
         targets[src].append(dest)
 
+    # Renames are cheap and atomic, so do them directly. Shared repos need to
+    # be copied, which is I/O-bound, so do those copies concurrently.
+    copies: List[Tuple[Path, Path]] = []
     for src, dsts in tqdm(targets.items(), unit=' repos', desc='Moving repos'):
         if not src.exists():
             # Might've already been moved in a previous, interrupted migration
@@ -217,7 +268,17 @@ def v3_repo_directory_role_names(p: Path) -> bool:  # noqa: C901
                 if dst.exists():
                     # _log(f'Skipping {dst}: Exists')
                     continue
-                shutil.copytree(src, dst)
+                copies.append((src, dst))
+
+    with ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2) as pool:
+        copy_futures = [
+                pool.submit(
+                    shutil.copytree, src, dst, copy_function=_reflink_copy)
+                for src, dst in copies]
+        for copy_future in tqdm(
+                as_completed(copy_futures), total=len(copy_futures),
+                unit=' repos', desc='Copying repos'):
+            copy_future.result()
 
     # Rename the directories
     _log('Renaming directories, please check repos_orig for dangling repos')
@@ -239,9 +300,7 @@ def v3_repo_directory_role_names(p: Path) -> bool:  # noqa: C901
         raise MigrationException('Not all repos migrated')
 
     # Write
-    with (p / 'repo_paths.json').open('w') as json_paths_f:
-        json.dump(
-                CONVERTER.unstructure(new_paths), json_paths_f, indent=4,
-                sort_keys=True)
+    (p / 'repo_paths.json').write_bytes(
+            json_dumps(CONVERTER.unstructure(new_paths), pretty=True))
 
     return True
@@ -1,10 +1,9 @@
 """Base models."""
-from typing import Type, TypeVar
+from typing import Type, TypeVar, Union
 
 import abc
-import json
 
-from models.serialize import CONVERTER
+from models.serialize import CONVERTER, json_dumps, json_loads
 
 _Self = TypeVar('_Self', bound='Model')
 
@@ -12,10 +11,13 @@ _Self = TypeVar('_Self', bound='Model')
 class Model(abc.ABC):
     """Base model defining interface for serialization/deserialization."""
 
+    # Allow slotted subclasses to do away with the instance dict.
+    __slots__ = ()
+
     @classmethod
-    def from_json_str(cls: Type[_Self], json_str: str) -> _Self:
-        """Parse from a JSON string."""
-        json_obj = json.loads(json_str)
+    def from_json_str(cls: Type[_Self], json_str: Union[str, bytes]) -> _Self:
+        """Parse from a JSON string or UTF-8 encoded bytes."""
+        json_obj = json_loads(json_str)
         return cls.from_json_obj(json_obj)
 
     @classmethod
@@ -26,7 +28,7 @@ class Model(abc.ABC):
     def to_json_str(self) -> str:
         """Serialize to a JSON string."""
         json_obj = self.to_json_obj()
-        return json.dumps(json_obj)
+        return json_dumps(json_obj).decode()
 
     def to_json_obj(self) -> object:
         """Serialize to a JSON object."""
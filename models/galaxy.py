@@ -1,25 +1,40 @@
 """Data models for the Ansible Galaxy API."""
 from __future__ import annotations
 
-from typing import Any, Dict, Sequence
+from typing import Any, Dict, Optional, Sequence, Union
 
-import abc
-import json
+import functools
 from pathlib import Path
 
 
 from models.base import Model
+from models.serialize import json_dumps, json_load_file, json_loads
 
 
 class GalaxyAPIPage(Model):
-    """Container for a page returned by the Galaxy API."""
+    """Container for a page returned by the Galaxy API.
+
+    The page content is kept as the raw JSON document and only parsed when
+    it's first accessed. Parsed content is treated as read-only. Pages are
+    dumped as indented JSON with sorted keys. That encoding is produced once,
+    and pages loaded from the dataset are already in it, so they're written
+    back verbatim.
+    """
 
     def __init__(
-            self, page_type: str, page_num: int, page_content: str
+            self, page_type: str, page_num: int,
+            page_content: Union[str, bytes]
     ) -> None:
         self.page_type = page_type
         self.page_num = page_num
-        self.page_content: Dict[str, Any] = json.loads(page_content)
+        self._raw_content = (
+                page_content if isinstance(page_content, bytes)
+                else page_content.encode())
+        self._dumped_content: Optional[bytes] = None
+
+    @functools.cached_property
+    def page_content(self) -> Dict[str, Any]:
+        return json_loads(self._raw_content)  # type: ignore[no-any-return]
 
     @property
     def id(self) -> str:
@@ -31,14 +46,17 @@ class GalaxyAPIPage(Model):
 
     def dump(self, directory: Path) -> Path:
         fpath = directory / f'{self.page_type}_{self.page_num}.json'
-        fpath.write_text(json.dumps(
-                self.page_content, sort_keys=True, indent=2))
+        if self._dumped_content is None:
+            self._dumped_content = json_dumps(self.page_content, pretty=True)
+        fpath.write_bytes(self._dumped_content)
         return fpath
 
     @classmethod
     def load(cls, page_id: str, path: Path) -> GalaxyAPIPage:
         page_type, page_num_str = page_id.split('/')
-        return cls(page_type, int(page_num_str), path.read_text())
+        page = cls(page_type, int(page_num_str), path.read_bytes())
+        page._dumped_content = page._raw_content
+        return page
 
 
 class GalaxyImportEventAPIResponse(Model):
@@ -56,9 +74,9 @@ class GalaxyImportEventAPIResponse(Model):
 
     def dump(self, directory: Path) -> Path:
         fpath = directory / f'{self.role_id}.json'
-        fpath.write_text(json.dumps(self.pages, sort_keys=True, indent=2))
+        fpath.write_bytes(json_dumps(self.pages, pretty=True))
         return fpath
 
     @classmethod
     def load(cls, role_id: str, path: Path) -> GalaxyImportEventAPIResponse:
-        return cls(int(role_id), json.loads(path.read_text()))
+        return cls(int(role_id), json_load_file(path))
@@ -1,23 +1,40 @@
 """Models for Git."""
-from typing import Optional, Union, Sequence
+from typing import (
+        Any, List, Optional, Sequence, Type, TypeVar, Union, overload,
+        TYPE_CHECKING)
+from datetime import datetime, timezone
 from pathlib import Path
 
+import sys
+
 import attr
-import git
-import pendulum
 import yaml
 
 try:
-    from yaml import CLoader as Loader, CDumper as Dumper
+    from yaml import CLoader as Loader
 except ImportError:
-    from yaml import Loader, Dumper  # type: ignore[misc]
+    from yaml import Loader  # type: ignore[misc]
 
 from models.base import Model
-from models.serialize import CONVERTER
-from models.role_metadata import Repository, XrefID
+from models.serialize import CONVERTER, json_dumps, json_load_file
+from models.role_metadata import XrefID
+
+if TYPE_CHECKING:
+    # GitPython is only needed to create models, not to load them.
+    import git
+
+_T = TypeVar('_T')
+
+# Fields are separated by NUL bytes, as are commits with `git log -z`. The
+# message must come last, as it spans multiple lines.
+_LOG_FORMAT = '%x00'.join(('%H', '%at', '%an', '%ae', '%ct', '%cn', '%ce', '%B'))
+_LOG_FORMAT_NUM_FIELDS = 8
+
+# GitPython leaves identities as None if it cannot parse them.
+_intern_optional = attr.converters.optional(sys.intern)
 
 
-@attr.s(auto_attribs=True, frozen=True)
+@attr.s(auto_attribs=True, frozen=True, slots=True)
 class GitRepo(Model):
     """Model for a local path containing a Git repository."""
     owner: str
@@ -39,17 +56,19 @@ class GitRepo(Model):
         return cls(owner=owner, name=name, repo_id=repo_id, path=path)
 
 
-@attr.s(auto_attribs=True, frozen=True)
+@attr.s(auto_attribs=True, frozen=True, slots=True)
 class GitCommit(Model):
     """Model for commits."""
     sha1: str
     message: str
-    authored_datetime: pendulum.DateTime
-    author_name: str
-    author_email: str
-    committed_datetime: pendulum.DateTime
-    committer_name: str
-    committer_email: str
+    authored_datetime: datetime
+    # Identities repeat across a repository's history, intern them so that
+    # commits share the same strings.
+    author_name: Optional[str] = attr.ib(converter=_intern_optional)
+    author_email: Optional[str] = attr.ib(converter=_intern_optional)
+    committed_datetime: datetime
+    committer_name: Optional[str] = attr.ib(converter=_intern_optional)
+    committer_email: Optional[str] = attr.ib(converter=_intern_optional)
 
     @property
     def id(self) -> str:
@@ -57,23 +76,63 @@ class GitCommit(Model):
 
 
     @classmethod
-    def from_git_commit(cls, commit: git.objects.commit.Commit) -> 'GitCommit':
+    def from_git_commit(cls, commit: 'git.objects.commit.Commit') -> 'GitCommit':
         return GitCommit(
             sha1=commit.hexsha, message=commit.message,
             author_name=commit.author.name, author_email=commit.author.email,
-            authored_datetime=pendulum.from_timestamp(commit.authored_date),
+            authored_datetime=datetime.fromtimestamp(
+                    commit.authored_date, tz=timezone.utc),
             committer_name=commit.committer.name,
             committer_email=commit.committer.email,
-            committed_datetime=pendulum.from_timestamp(commit.committed_date))
+            committed_datetime=datetime.fromtimestamp(
+                    commit.committed_date, tz=timezone.utc))
 
+    @classmethod
+    def batch_from_git_repo(cls, repo: 'git.Repo') -> List['GitCommit']:
+        """Create models for all commits reachable from HEAD.
+
+        Reads all commits with a single `git log` rather than letting
+        GitPython lazily parse each commit object separately. Raises
+        GitCommandError for repositories without commits.
+        """
+        log = repo.git.log(
+                '-z', '--format=' + _LOG_FORMAT, stdout_as_string=False)
+        # Each commit is terminated by a NUL, so the last field is empty.
+        # Decode like GitPython does, so that commits which aren't valid
+        # UTF-8 get replacement characters rather than lone surrogates.
+        fields = (
+                field.decode('utf-8', 'replace')
+                for field in log.split(b'\0'))
+        commits = []
+        for (sha1, authored_ts, author_name, author_email, committed_ts,
+                committer_name, committer_email, message) in zip(
+                    *[fields] * _LOG_FORMAT_NUM_FIELDS):
+            if not all((
+                    authored_ts, author_name, author_email,
+                    committed_ts, committer_name, committer_email)):
+                # git leaves out identities it cannot parse, for which
+                # GitPython produces None or partial identities. These are
+                # rare, so let GitPython parse them to get identical results.
+                commits.append(cls.from_git_commit(repo.commit(sha1)))
+                continue
+            commits.append(GitCommit(
+                sha1=sha1, message=message,
+                author_name=author_name, author_email=author_email,
+                authored_datetime=datetime.fromtimestamp(
+                    int(authored_ts), tz=timezone.utc),
+                committer_name=committer_name, committer_email=committer_email,
+                committed_datetime=datetime.fromtimestamp(
+                    int(committed_ts), tz=timezone.utc)))
+        return commits
 
-@attr.s(auto_attribs=True, frozen=True)
+
+@attr.s(auto_attribs=True, frozen=True, slots=True)
 class GitTag(Model):
     """Model for git tags."""
     name: str
     message: Optional[str]
     commit_sha1: str
-    tagged_datetime: Optional[pendulum.DateTime]
+    tagged_datetime: Optional[datetime]
     tagger_name: Optional[str]
     tagger_email: Optional[str]
 
@@ -82,7 +141,7 @@ class GitTag(Model):
         return self.name
 
     @classmethod
-    def from_git_tag(cls, tag: git.refs.tag.TagReference) -> Optional['GitTag']:
+    def from_git_tag(cls, tag: 'git.refs.tag.TagReference') -> Optional['GitTag']:
         if not tag.tag:
             return GitTag(
                     name=tag.name, commit_sha1=tag.commit.hexsha, message=None,
@@ -92,10 +151,11 @@ class GitTag(Model):
                 name=actual_tag.tag, message=actual_tag.message,
                 commit_sha1=actual_tag.object.hexsha, tagger_name=actual_tag.tagger.name,
                 tagger_email=actual_tag.tagger.email,
-                tagged_datetime=pendulum.from_timestamp(actual_tag.tagged_date))
+                tagged_datetime=datetime.fromtimestamp(
+                    actual_tag.tagged_date, tz=timezone.utc))
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, eq=False)
 class GitRepoMetadata(Model):
     commits: Sequence[GitCommit]
     tags: Sequence[GitTag]
@@ -109,12 +169,12 @@ class GitRepoMetadata(Model):
     def dump(self, path: Path) -> Path:
         owner_dir = path / self.repo_owner
         owner_dir.mkdir(exist_ok=True, parents=True)
-        repo_file = owner_dir / (self.repo_name + '.yaml')
-        content = {
-            'commits': CONVERTER.unstructure(self.commits),
-            'tags': CONVERTER.unstructure(self.tags)
-        }
-        repo_file.write_text(yaml.dump(content, sort_keys=True))
+        repo_file = owner_dir / (self.repo_name + '.json')
+        # Encode the models while serializing rather than unstructuring all
+        # of them into an intermediate structure first.
+        content = {'commits': self.commits, 'tags': self.tags}
+        repo_file.write_bytes(json_dumps(
+                content, pretty=True, default=_encode_git_model))
         return repo_file
 
 
@@ -123,6 +183,47 @@ class GitRepoMetadata(Model):
         return _LazyGitRepoMetadataProxy(path.stem, path.parts[-2], path)
 
 
+def _encode_git_model(obj: object) -> object:
+    if isinstance(obj, (GitCommit, GitTag)):
+        return attr.asdict(obj, recurse=False)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, _LazyStructuredSequence):
+        return list(obj)
+    raise TypeError(f'Cannot serialize {type(obj).__name__}')
+
+
+class _LazyStructuredSequence(Sequence[_T]):
+    """Sequence that only structures its elements when they're accessed."""
+
+    def __init__(self, raw_elements: List[Any], element_type: Type[_T]) -> None:
+        self._raw_elements = raw_elements
+        self._element_type = element_type
+        self._elements: List[Optional[_T]] = [None] * len(raw_elements)
+
+    def __len__(self) -> int:
+        return len(self._raw_elements)
+
+    @overload
+    def __getitem__(self, index: int) -> _T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[_T]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[_T, Sequence[_T]]:
+        if isinstance(index, slice):
+            return [self[idx] for idx in range(*index.indices(len(self)))]
+
+        element = self._elements[index]
+        if element is None:
+            element = CONVERTER.structure(
+                    self._raw_elements[index], self._element_type)
+            self._elements[index] = element
+        return element
+
+
 class _LazyGitRepoMetadataProxy(GitRepoMetadata):
 
     def __init__(self, repo_name: str, repo_owner: str, path: Path) -> None:
@@ -133,9 +234,14 @@ class _LazyGitRepoMetadataProxy(GitRepoMetadata):
 
     def _ensure_loaded(self) -> None:
         if not self._loaded:
-            content = yaml.load(self._file.read_text(), Loader=Loader)
-            self._commits = CONVERTER.structure(content['commits'], Sequence[GitCommit])
-            self._tags = CONVERTER.structure(content['tags'], Sequence[GitTag])
+            if self._file.suffix == '.json':
+                content = json_load_file(self._file)
+            else:
+                # Datasets dumped before the switch to JSON.
+                content = yaml.load(self._file.read_bytes(), Loader=Loader)
+            self._commits = _LazyStructuredSequence(
+                    content['commits'], GitCommit)
+            self._tags = _LazyStructuredSequence(content['tags'], GitTag)
             self._loaded = True
 
     @property
@@ -147,11 +253,11 @@ class _LazyGitRepoMetadataProxy(GitRepoMetadata):
         return self._repo_owner
 
     @property
-    def commits(self) -> str:  # type: ignore[override]
+    def commits(self) -> Sequence[GitCommit]:  # type: ignore[override]
         self._ensure_loaded()
-        return self._commits  # type: ignore[no-any-return]
+        return self._commits
 
     @property
-    def tags(self) -> str:  # type: ignore[override]
+    def tags(self) -> Sequence[GitTag]:  # type: ignore[override]
         self._ensure_loaded()
-        return self._tags  # type: ignore[no-any-return]
+        return self._tags
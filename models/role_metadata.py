@@ -1,7 +1,17 @@
 """Models for role metadata."""
 from __future__ import annotations
 
-from typing import Any, Collection, Dict, Iterator, List, Mapping, Optional, Sequence, Union, Type, TypeVar, cast
+from typing import Any, Callable, Collection, Dict, Generic, ItemsView, Iterator, KeysView, List, Mapping, Optional, Sequence, Tuple, Union, Type, TypeVar, ValuesView, cast
+
+import collections.abc
+import concurrent.futures
+import functools
+import hashlib
+import operator
+import os
+import pickle
+import random
+import sys
 
 from abc import abstractmethod
 from pathlib import Path
@@ -12,27 +22,28 @@ import pendulum
 import yaml
 
 try:
-    from yaml import CLoader as Loader, CDumper as Dumper
+    from yaml import CLoader as Loader
 except ImportError:
-    from yaml import Loader, Dumper  # type: ignore[misc]
-
-from pprint import pprint
+    from yaml import Loader  # type: ignore[misc]
 
 from models.base import Model
 from models.galaxy import GalaxyAPIPage
 from models.galaxy_schema import SCHEMAS
-from util.misc import capitalized_to_underscored
+from models.serialize import intern_datetime, json_dumps, json_load_file
 
 
 CONVERTER = cattr.GenConverter()
 CONVERTER.register_structure_hook(
-        pendulum.DateTime,
-        lambda ts, _: cast(pendulum.DateTime, pendulum.parse(ts)))
+        pendulum.DateTime, lambda ts, _: intern_datetime(ts))
 CONVERTER.register_unstructure_hook(
         pendulum.DateTime, lambda dt: dt.to_rfc3339_string())
 
 
 
+_get_id = operator.itemgetter('id')
+_get_entity_id = operator.attrgetter('entity_id')
+
+
 class MetadataMap:
     """Maps entity IDs to their JSON-parsed objects."""
 
@@ -47,83 +58,176 @@ class MetadataMap:
         self.community_surveys: Dict[int, Any] = {}
         self.content: Dict[int, Any] = {}
         self.role_search: Dict[int, Any] = {}
+        # Same dicts as the attributes above, indexed by page type.
+        self._by_type: Dict[str, Dict[int, Any]] = {
+                'roles': self.roles,
+                'namespaces': self.namespaces,
+                'platforms': self.platforms,
+                'provider_namespaces': self.provider_namespaces,
+                'repositories': self.repositories,
+                'tags': self.tags,
+                'community_surveys': self.community_surveys,
+                'content': self.content,
+                'role_search': self.role_search,
+        }
 
         for page in scrape_pages:
             if page.page_type == 'users':
                 continue
-            dct = getattr(self, page.page_type)
+            dct = self._by_type[page.page_type]
             results = cast(
                     Sequence[Dict[str, object]], page.response['results'])
-            for result in results:
-                dct[result['id']] = result
-
-    def verify_schema(self) -> None:
-        """Verify that we understand the full schema."""
-        for page_type, schema in SCHEMAS.items():
-            self._verify_schema(
-                    list(getattr(self, page_type).values()), schema, page_type)
-
-    def _verify_schema(
-            self, objs: Sequence[object], schema: Any, page_type: str,
-    ) -> None:
+            dct.update(zip(map(_get_id, results), results))
+
+    def verify_schema(self, sample: float = 1.0) -> None:
+        """Verify that we understand the full schema.
+
+        Only verifies a random fraction of the objects if `sample` < 1.
+        """
+        if not 0.0 <= sample <= 1.0:
+            raise ValueError(
+                    f'Schema sample must be a fraction between 0 and 1, '
+                    f'got {sample}')
+        for page_type in SCHEMAS:
+            objs: Sequence[object] = list(self._by_type[page_type].values())
+            if sample < 1.0:
+                objs = random.sample(objs, round(len(objs) * sample))
+            self._verify_schema(objs, page_type)
+
+    def _verify_schema(self, objs: Sequence[object], page_type: str) -> None:
+        verify = _get_schema_verifier(page_type)
         for obj in objs:
             try:
-                self._verify_individual(obj, schema)
+                verify(obj)
             except:
-                print(page_type + ': Wrong schema')
-                pprint(obj)
+                # Bounded representation, objects can be huge.
+                from reprlib import repr as short_repr
+                print(page_type + ': Wrong schema:', short_repr(obj))
                 raise
 
-    def _verify_individual(self, obj: Any, schema: Any) -> None:
-        if isinstance(schema, dict):
-            # Nested dicts
-            assert isinstance(obj, dict)
-            leftover_keys = set(obj.keys()) - set(schema.keys())
-            assert not leftover_keys, leftover_keys
-            for k in obj:
-                self._verify_individual(obj[k], schema[k])
-        elif isinstance(schema, list):
-            # Lists
+
+_Verifier = Callable[[Any], None]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_schema_verifier(page_type: str) -> _Verifier:
+    return _compile_schema(SCHEMAS[page_type])
+
+
+def _compile_schema(schema: Any) -> _Verifier:
+    """Compile a schema into a function verifying objects against it.
+
+    The schema is walked only once, rather than being interpreted anew for
+    each verified object.
+    """
+    if isinstance(schema, type):
+        return _compile_type_schema(schema)
+    compile_kind = _SCHEMA_COMPILERS.get(type(schema), _compile_scalar_schema)
+    return compile_kind(schema)
+
+
+def _compile_dict_schema(schema: Dict[str, Any]) -> _Verifier:
+    # Nested dicts
+    key_verifiers = {k: _compile_schema(v) for k, v in schema.items()}
+    keys = key_verifiers.keys()
+
+    def verify_dict(obj: Any) -> None:
+        assert isinstance(obj, dict)
+        leftover_keys = obj.keys() - keys
+        assert not leftover_keys, leftover_keys
+        for k, v in obj.items():
+            key_verifiers[k](v)
+    return verify_dict
+
+
+def _compile_list_schema(schema: List[Any]) -> _Verifier:
+    # Lists
+    if not schema:
+        def verify_empty_list(obj: Any) -> None:
             assert isinstance(obj, list)
-            if not schema:
-                assert not obj, 'Expected empty list'
-            else:
-                for subobj in obj:
-                    self._verify_individual(subobj, schema[0])
-        elif isinstance(schema, tuple):
-            # Tuple: Multiple possibilities.
-            matched = False
-            for possibility in schema:
-                try:
-                    self._verify_individual(obj, possibility)
-                    return  # Passed
-                except Exception as e:
-                    pass
-
-            raise ValueError(f'Failed validation of multiple options: {schema}')
-        elif schema is pendulum.DateTime:
+            assert not obj, 'Expected empty list'
+        return verify_empty_list
+
+    verify_element = _compile_schema(schema[0])
+
+    def verify_list(obj: Any) -> None:
+        assert isinstance(obj, list)
+        for subobj in obj:
+            verify_element(subobj)
+    return verify_list
+
+
+def _compile_tuple_schema(schema: Tuple[Any, ...]) -> _Verifier:
+    # Tuple: Multiple possibilities.
+    possibilities = [_compile_schema(possibility) for possibility in schema]
+
+    def verify_any(obj: Any) -> None:
+        for verify_possibility in possibilities:
+            try:
+                verify_possibility(obj)
+                return  # Passed
+            except Exception:
+                pass
+
+        raise ValueError(
+                f'Failed validation of multiple options: {schema}')
+    return verify_any
+
+
+def _compile_type_schema(schema: type) -> _Verifier:
+    if schema is pendulum.DateTime:
+        def verify_datetime(obj: Any) -> None:
             # Date times should be able to be parsed
             assert isinstance(obj, str), f'{obj} is not a string'
-            pendulum.parse(obj)
-        elif isinstance(schema, type):
-            # Primitive types
-            assert isinstance(obj, schema), f'{type(obj)} vs {schema}'
-        else:
-            # Scalar values
-            assert schema == obj, f'{obj} is not {schema}'
+            intern_datetime(obj)
+        return verify_datetime
+
+    def verify_type(obj: Any) -> None:
+        # Primitive types
+        assert isinstance(obj, schema), f'{type(obj)} vs {schema}'
+    return verify_type
+
+
+def _compile_scalar_schema(schema: Any) -> _Verifier:
+    def verify_scalar(obj: Any) -> None:
+        # Scalar values
+        assert schema == obj, f'{obj} is not {schema}'
+    return verify_scalar
+
+
+_SCHEMA_COMPILERS: Dict[type, Callable[[Any], _Verifier]] = {
+    dict: _compile_dict_schema,
+    list: _compile_list_schema,
+    tuple: _compile_tuple_schema,
+}
 
 
 class XrefID:
     """Model for xrefs."""
 
+    __slots__ = ('entity_type', 'entity_id')
+
     def __init__(self, entity_type: Union[Type[GalaxyEntity], str], id: int) -> None:
+        # Interned, there are only a handful of entity types but many xrefs.
         if isinstance(entity_type, type):
-            self.entity_type = entity_type.__name__
+            self.entity_type = sys.intern(entity_type.__name__)
         else:
-            self.entity_type = entity_type
+            self.entity_type = sys.intern(entity_type)
         self.entity_id = id
 
 
+    @classmethod
+    def _of_type_name(cls, entity_type: str, id: int) -> XrefID:
+        """Create an xref, skipping the type check and interning.
+
+        For building many xrefs at once, `entity_type` must be a literal
+        (and therefore interned) entity type name.
+        """
+        xref = cls.__new__(cls)
+        xref.entity_type = entity_type
+        xref.entity_id = id
+        return xref
+
     def __str__(self) -> str:
         return f'{self.entity_type}:{self.entity_id}'
 
@@ -145,6 +249,8 @@ _EntityType = TypeVar('_EntityType', bound='GalaxyEntity')
 class GalaxyEntity(Model):
     """Base class for Galaxy entity models."""
 
+    __slots__ = ()
+
     @classmethod
     @abstractmethod
     def from_galaxy_json(cls: Type[_EntityType], json: Dict[str, Any]) -> _EntityType:  # type: ignore[misc]
@@ -158,25 +264,16 @@ def _parse_date(
         if may_be_none:
             return None
         raise ValueError('Expected date, got None, not allowed')
-    datetime = pendulum.parse(date_str)
-    assert isinstance(datetime, pendulum.DateTime)
-    return datetime
-
-
-def _extend_with_dates(
-        attrs: Dict[str, Any], json: Dict[str, Any],
-        mod_may_be_none: bool = False
-) -> None:
-    # Creation date is always set.
-    attrs['creation_date'] = _parse_date(json['created'], False)
-    attrs['modification_date'] = _parse_date(json['modified'], mod_may_be_none)
+    parsed = intern_datetime(date_str)
+    assert isinstance(parsed, pendulum.DateTime)
+    return parsed
 
 
 def _create_gh_link(user: str, repo: str) -> str:
     return f'https://github.com/{user}/{repo}'
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class CommunitySurvey(GalaxyEntity):
     """Model for Galaxy community survey."""
 
@@ -204,24 +301,22 @@ class CommunitySurvey(GalaxyEntity):
         assert json['active'] is None
         assert json['content_id'] == json['repository']
 
-        attrs: Dict[str, Any] = {}
+        return CommunitySurvey(
+                entity_id=json['id'],
+                reviewed_repository=XrefID(Repository, json['repository']),
+                reviewer_user_id=XrefID(User, json['user']),
 
-        attrs['entity_id'] = json['id']
-        attrs['reviewed_repository'] = XrefID(Repository, json['repository'])
-        attrs['reviewer_user_id'] = XrefID(User, json['user'])
+                score_documentation=json['docs'],
+                score_does_what_it_says=json['does_what_it_says'],
+                score_ease_of_use=json['ease_of_use'],
+                score_used_in_production=json['used_in_production'],
+                score_works_as_is=json['works_as_is'],
 
-        attrs['score_documentation'] = json['docs']
-        attrs['score_does_what_it_says'] = json['does_what_it_says']
-        attrs['score_ease_of_use'] = json['ease_of_use']
-        attrs['score_used_in_production'] = json['used_in_production']
-        attrs['score_works_as_is'] = json['works_as_is']
+                creation_date=_parse_date(json['created'], False),
+                modification_date=_parse_date(json['modified'], False))
 
-        _extend_with_dates(attrs, json)
 
-        return CommunitySurvey(**attrs)
-
-
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class ContentScoreMessage(GalaxyEntity):
     """Model for task messages, contained in Content.
 
@@ -257,7 +352,7 @@ class ContentScoreMessage(GalaxyEntity):
         return ContentScoreMessage(**json)
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class Content(GalaxyEntity):
     """Model for Galaxy content."""
 
@@ -296,34 +391,32 @@ class Content(GalaxyEntity):
         assert json['original_name']
         smry = json['summary_fields']
 
-        attrs: Dict[str, Any] = {}
-
-        attrs['entity_id'] = json['id']
-        attrs['content_type'] = json['content_type']
-        attrs['role_type'] = json['role_type'] or None
-
-        attrs['name'] = json['name']
-        attrs['original_name'] = json['original_name']
-        attrs['description'] = json['description'] or None
-        attrs['download_count'] = json['download_count']
+        return Content(
+                entity_id=json['id'],
+                content_type=json['content_type'],
+                role_type=json['role_type'] or None,
 
-        attrs['score_content'] = json['content_score']
-        attrs['score_metadata'] = json['metadata_score']
-        attrs['score_quality'] = json['quality_score']
-        attrs['score_messages'] = list(_create_all(
-                smry['task_messages'], ContentScoreMessage).values())
+                name=json['name'],
+                original_name=json['original_name'],
+                description=json['description'] or None,
+                download_count=json['download_count'],
 
-        attrs['namespace_id'] = XrefID(Namespace, smry['namespace']['id'])
-        attrs['repository_id'] = XrefID(Repository, smry['repository']['id'])
-        attrs['dependencies'] = smry['dependencies']
+                score_content=json['content_score'],
+                score_metadata=json['metadata_score'],
+                score_quality=json['quality_score'],
+                score_messages=list(_create_all(
+                    smry['task_messages'], ContentScoreMessage).values()),
 
-        _extend_with_dates(attrs, json)
-        attrs['import_date'] = _parse_date(json['imported'], True)
+                namespace_id=XrefID(Namespace, smry['namespace']['id']),
+                repository_id=XrefID(Repository, smry['repository']['id']),
+                dependencies=smry['dependencies'],
 
-        return Content(**attrs)
+                creation_date=_parse_date(json['created'], False),
+                modification_date=_parse_date(json['modified'], False),
+                import_date=_parse_date(json['imported'], True))
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class Namespace(GalaxyEntity):
     """Model for Galaxy namespaces."""
 
@@ -355,31 +448,30 @@ class Namespace(GalaxyEntity):
         assert json['name']
         smry = json['summary_fields']
 
-        attrs: Dict[str, Any] = {}
-
-        attrs['entity_id'] = json['id']
-        attrs['is_active'] = json['active']
-        attrs['name'] = json['name']
-        attrs['company_name'] = json['company'] or None
-        attrs['location'] = json['location'] or None
-        attrs['email'] = json['email'] or None
-        attrs['description'] = json['description'] or None
-        attrs['homepage_url'] = json['html_url'] or None
-        attrs['avatar_url'] = json['avatar_url'] or None
-
-        attrs['content_counts'] = smry['content_counts']
-        attrs['owner_ids'] = [
-                XrefID(User, owner['id']) for owner in smry['owners']]
-        attrs['provider_namespace_ids'] = [
-                XrefID(ProviderNamespace, pns['id'])
-                for pns in smry['provider_namespaces']]
-
-        _extend_with_dates(attrs, json)
-
-        return Namespace(**attrs)
-
-
-@attr.s(auto_attribs=True)
+        return Namespace(
+                entity_id=json['id'],
+                is_active=json['active'],
+                name=json['name'],
+                company_name=json['company'] or None,
+                location=json['location'] or None,
+                email=json['email'] or None,
+                description=json['description'] or None,
+                homepage_url=json['html_url'] or None,
+                avatar_url=json['avatar_url'] or None,
+
+                content_counts=smry['content_counts'],
+                owner_ids=[
+                    XrefID._of_type_name('User', owner['id'])
+                    for owner in smry['owners']],
+                provider_namespace_ids=[
+                    XrefID._of_type_name('ProviderNamespace', pns['id'])
+                    for pns in smry['provider_namespaces']],
+
+                creation_date=_parse_date(json['created'], False),
+                modification_date=_parse_date(json['modified'], False))
+
+
+@attr.s(auto_attribs=True, slots=True)
 class ProviderNamespace(GalaxyEntity):
     """Model for Galaxy provider namespaces."""
 
@@ -416,30 +508,31 @@ class ProviderNamespace(GalaxyEntity):
         except KeyError:
             pass
 
-        attrs: Dict[str, Any] = {}
-
-        attrs['entity_id'] = json['id']
-        attrs['name'] = json['name']
-        attrs['display_name'] = json['display_name'] or None
-        attrs['company_name'] = json['company'] or None
-        attrs['location'] = json['location'] or None
-        attrs['email'] = json['email'] or None
-        attrs['description'] = json['description'] or None
-        attrs['homepage_url'] = json['html_url'] or None
-        attrs['avatar_url'] = json['avatar_url'] or None
-        attrs['follower_count'] = json['followers'] or 0
-
+        namespace_id: Optional[XrefID]
         try:
-            attrs['namespace_id'] = XrefID(Namespace, smry['namespace']['id'])
+            namespace_id = XrefID(Namespace, smry['namespace']['id'])
         except KeyError:
-            attrs['namespace_id'] = None
+            namespace_id = None
+
+        return ProviderNamespace(
+                entity_id=json['id'],
+                name=json['name'],
+                display_name=json['display_name'] or None,
+                company_name=json['company'] or None,
+                location=json['location'] or None,
+                email=json['email'] or None,
+                description=json['description'] or None,
+                homepage_url=json['html_url'] or None,
+                avatar_url=json['avatar_url'] or None,
+                follower_count=json['followers'] or 0,
 
-        _extend_with_dates(attrs, json)
+                namespace_id=namespace_id,
 
-        return ProviderNamespace(**attrs)
+                creation_date=_parse_date(json['created'], False),
+                modification_date=_parse_date(json['modified'], False))
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class Repository(GalaxyEntity):
     """Model for Galaxy Repository."""
 
@@ -494,7 +587,7 @@ class Repository(GalaxyEntity):
         return str(self.entity_id)
 
     @classmethod
-    def from_galaxy_json(cls, json: Dict[str, Any], surveys: Dict[int, CommunitySurvey]) -> Repository:  # type: ignore[misc, override]
+    def from_galaxy_json(cls, json: Dict[str, Any], surveys_by_repo: Dict[int, List[XrefID]]) -> Repository:  # type: ignore[misc, override]
         # Sanity checks
         assert json['active'] is None
         assert json['external_url']
@@ -504,79 +597,73 @@ class Repository(GalaxyEntity):
 
         smry = json['summary_fields']
 
-        attrs: Dict[str, Any] = {}
-
-        attrs['entity_id'] = json['id']
-        attrs['name'] = json['name']
-        attrs['original_name'] = json['original_name']
-        attrs['description'] = json['description'] or None
-        attrs['readme'] = json['readme'] or None
-
-        attrs['commit_sha'] = json['commit'] or None
-        attrs['commit_creation_date'] = _parse_date(
-                json['commit_created'], may_be_none=True)
-        attrs['commit_message'] = json['commit_message'] or None
-
-        attrs['is_deprecated'] = json['deprecated']
-        attrs['is_enabled'] = json['is_enabled']
-        attrs['format'] = json['format'] or None
-        attrs['download_url'] = json['download_url']
-        attrs['github_url'] = json['external_url']
-        attrs['import_branch'] = json['import_branch'] or None
-        attrs['travis_ci_build_url'] = json['travis_build_url'] or None
-        attrs['travis_ci_status_badge_url'] = json['travis_status_url'] or None
-        attrs['versions'] = smry['versions']
-
-        attrs['download_count'] = json['download_count']
-        attrs['stargazers_count'] = json['stargazers_count']
-        attrs['watchers_count'] = json['watchers_count']
-        attrs['forks_count'] = json['forks_count']
-        attrs['open_issues_count'] = json['open_issues_count']
-
-        attrs['community_survey_score'] = json['community_score']
-        attrs['community_surveys'] = [
-                XrefID(CommunitySurvey, srv.entity_id)
-                for srv in surveys.values()
-                if srv.reviewed_repository.entity_id == json['id']]
-        attrs['quality_score'] = json['quality_score']
-        attrs['latest_quality_score_date'] = _parse_date(
-                json['quality_score_date'], may_be_none=True)
-
-        attrs['content_counts'] = smry['content_counts']
-        attrs['content_ids'] = [
-                XrefID(Content, cnt['id']) for cnt in smry['content_objects']]
-        attrs['provider_namespace_id'] = XrefID(
-                ProviderNamespace, smry['provider_namespace']['id'])
+        namespace_id: Optional[XrefID]
         try:
-            attrs['namespace_id'] = XrefID(Namespace, smry['namespace']['id'])
+            namespace_id = XrefID(Namespace, smry['namespace']['id'])
         except KeyError:
-            attrs['namespace_id'] = None
+            namespace_id = None
 
         imprt = smry['latest_import']
         if imprt:
-            attrs['last_import_created_date'] = _parse_date(
-                    imprt['created'], may_be_none=False)
-            attrs['last_import_modified_date'] = _parse_date(
-                    imprt['modified'], may_be_none=False)
-            attrs['last_import_started_date'] = _parse_date(
-                    imprt['started'], may_be_none=True)
-            attrs['last_import_finished_date'] = _parse_date(
-                    imprt['finished'], may_be_none=True)
             assert imprt['state']
-            attrs['last_import_status'] = imprt['state']
-        else:
-            attrs['last_import_created_date'] = None
-            attrs['last_import_modified_date'] = None
-            attrs['last_import_started_date'] = None
-            attrs['last_import_finished_date'] = None
-            attrs['last_import_status'] = None
 
-        _extend_with_dates(attrs, json)
-
-        return Repository(**attrs)
-
-
-@attr.s(auto_attribs=True)
+        return Repository(
+                entity_id=json['id'],
+                name=json['name'],
+                original_name=json['original_name'],
+                description=json['description'] or None,
+                readme=json['readme'] or None,
+
+                commit_sha=json['commit'] or None,
+                commit_creation_date=_parse_date(
+                    json['commit_created'], may_be_none=True),
+                commit_message=json['commit_message'] or None,
+
+                is_deprecated=json['deprecated'],
+                is_enabled=json['is_enabled'],
+                format=json['format'] or None,
+                download_url=json['download_url'],
+                github_url=json['external_url'],
+                import_branch=json['import_branch'] or None,
+                travis_ci_build_url=json['travis_build_url'] or None,
+                travis_ci_status_badge_url=json['travis_status_url'] or None,
+                versions=smry['versions'],
+
+                download_count=json['download_count'],
+                stargazers_count=json['stargazers_count'],
+                watchers_count=json['watchers_count'],
+                forks_count=json['forks_count'],
+                open_issues_count=json['open_issues_count'],
+
+                community_survey_score=json['community_score'],
+                community_surveys=surveys_by_repo.get(json['id'], []),
+                quality_score=json['quality_score'],
+                latest_quality_score_date=_parse_date(
+                    json['quality_score_date'], may_be_none=True),
+
+                content_counts=smry['content_counts'],
+                content_ids=[
+                    XrefID._of_type_name('Content', cnt['id'])
+                    for cnt in smry['content_objects']],
+                provider_namespace_id=XrefID(
+                    ProviderNamespace, smry['provider_namespace']['id']),
+                namespace_id=namespace_id,
+
+                last_import_created_date=_parse_date(
+                    imprt['created'], may_be_none=False) if imprt else None,
+                last_import_modified_date=_parse_date(
+                    imprt['modified'], may_be_none=False) if imprt else None,
+                last_import_started_date=_parse_date(
+                    imprt['started'], may_be_none=True) if imprt else None,
+                last_import_finished_date=_parse_date(
+                    imprt['finished'], may_be_none=True) if imprt else None,
+                last_import_status=imprt['state'] if imprt else None,
+
+                creation_date=_parse_date(json['created'], False),
+                modification_date=_parse_date(json['modified'], False))
+
+
+@attr.s(auto_attribs=True, slots=True)
 class Platform(GalaxyEntity):
     """Model for a platform."""
 
@@ -592,7 +679,7 @@ class Platform(GalaxyEntity):
         return Platform(name=json['name'], version=json['release'])
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class RoleVersion(GalaxyEntity):
     """Model for a role version."""
 
@@ -606,19 +693,17 @@ class RoleVersion(GalaxyEntity):
 
     @classmethod
     def from_galaxy_json(cls, json: Dict[str, Any]) -> RoleVersion:  # type: ignore[misc]
-        attrs = {
-            'entity_id': json['id'],
-            'version': json['name'],
-            'release_date': _parse_date(json.get('release_date'), may_be_none=True)
-        }
-
-        return RoleVersion(**attrs)
+        return RoleVersion(
+                entity_id=json['id'],
+                version=json['name'],
+                release_date=_parse_date(
+                    json.get('release_date'), may_be_none=True))
 
 
 def _fuzzy_match(src: str, target: Optional[str]) -> None:
     assert src == target or not src and target is None, f'{src} vs {target}'
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class Role(GalaxyEntity):
     """Model for Galaxy role."""
 
@@ -675,42 +760,41 @@ class Role(GalaxyEntity):
             assert role['readme'] == linked_repo.readme
 
 
-        attrs: Dict[str, Any] = {}
-
-        attrs['entity_id'] = json['id']
-        attrs['canonical_id'] = smry['namespace']['name'] + '.' + json['name']
-        attrs['name'] = json['name']
-        attrs['username'] = json.get('username')
-        attrs['description'] = json['description'] or None
-        attrs['company'] = json['company'] or None
-        attrs['is_valid'] = json['is_valid']
-        attrs['license'] = json['license']
-        attrs['min_ansible_version'] = json['min_ansible_version'] or None
-        attrs['role_type'] = json['role_type'] or None
-        attrs['dependencies'] = smry['dependencies']
-        attrs['supported_platforms'] = [
-                Platform.from_galaxy_json(pfrm) for pfrm in smry['platforms']]
-        attrs['download_count'] = json['download_count']
-        attrs['download_rank'] = json.get('download_rank')
-        attrs['tags'] = smry['tags']
-        attrs['versions'] = [
-                RoleVersion.from_galaxy_json(v) for v in smry['versions']]
-
-        attrs['commit_sha'] = json['commit']
-        attrs['commit_message'] = json['commit_message']
-
-        attrs['namespace_id'] = XrefID(Namespace, smry['namespace']['id'])
-        attrs['provider_namespace_id'] = XrefID(
-                    ProviderNamespace, smry['provider_namespace']['id'])
-        attrs['repository_id'] = XrefID(Repository, smry['repository']['id'])
-
-        _extend_with_dates(attrs, json)
-        attrs['imported_date'] = _parse_date(json['imported'], may_be_none=True)
-
-        return Role(**attrs)
-
-
-@attr.s(auto_attribs=True)
+        return Role(
+                entity_id=json['id'],
+                canonical_id=smry['namespace']['name'] + '.' + json['name'],
+                name=json['name'],
+                username=json.get('username'),
+                description=json['description'] or None,
+                company=json['company'] or None,
+                is_valid=json['is_valid'],
+                license=json['license'],
+                min_ansible_version=json['min_ansible_version'] or None,
+                role_type=json['role_type'] or None,
+                dependencies=smry['dependencies'],
+                supported_platforms=[
+                    Platform.from_galaxy_json(pfrm)
+                    for pfrm in smry['platforms']],
+                download_count=json['download_count'],
+                download_rank=json.get('download_rank'),
+                tags=smry['tags'],
+                versions=[
+                    RoleVersion.from_galaxy_json(v) for v in smry['versions']],
+
+                commit_sha=json['commit'],
+                commit_message=json['commit_message'],
+
+                namespace_id=XrefID(Namespace, smry['namespace']['id']),
+                provider_namespace_id=XrefID(
+                    ProviderNamespace, smry['provider_namespace']['id']),
+                repository_id=XrefID(Repository, smry['repository']['id']),
+
+                creation_date=_parse_date(json['created'], False),
+                modification_date=_parse_date(json['modified'], False),
+                imported_date=_parse_date(json['imported'], may_be_none=True))
+
+
+@attr.s(auto_attribs=True, slots=True)
 class Tag(GalaxyEntity):
     """Model for Galaxy tags."""
 
@@ -734,17 +818,14 @@ class Tag(GalaxyEntity):
         assert isinstance(json['id'], int)
         assert isinstance(json['name'], str)
 
-        attrs: Dict[str, Any] = {}
-
-        attrs['entity_id'] = json['id']
-        attrs['name'] = json['name']
-
-        _extend_with_dates(attrs, json)
+        return Tag(
+                entity_id=json['id'],
+                name=json['name'],
+                creation_date=_parse_date(json['created'], False),
+                modification_date=_parse_date(json['modified'], False))
 
-        return Tag(**attrs)
 
-
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class User(GalaxyEntity):
     """Model for Galaxy users."""
 
@@ -770,26 +851,26 @@ class User(GalaxyEntity):
         assert json['active']  # Not including it, always True
         assert json['url'] == f'/api/v1/users/{json["id"]}/'
 
-        attrs: Dict[str, Any] = {}
-
-        attrs['entity_id'] = json['id']
-        attrs['username'] = json['username']
-        attrs['full_name'] = json['full_name'] or None
-        assert attrs['full_name'] != ''
-        attrs['date_joined'] = _parse_date(json['date_joined'], False)
-        attrs['avatar_url'] = json['avatar_url'] or None
-        attrs['is_staff'] = json['staff']
+        full_name = json['full_name'] or None
+        assert full_name != ''
 
-        attrs['starred_repositories'] = [
-                _create_gh_link(d['github_user'], d['github_repo'])
-                for d in json['summary_fields']['starred']]
-        attrs['subscribed_repositories'] = [
-                _create_gh_link(d['github_user'], d['github_repo'])
-                for d in json['summary_fields']['subscriptions']]
+        return User(
+                entity_id=json['id'],
+                username=json['username'],
+                full_name=full_name,
+                date_joined=_parse_date(json['date_joined'], False),
+                avatar_url=json['avatar_url'] or None,
+                is_staff=json['staff'],
 
-        _extend_with_dates(attrs, json, mod_may_be_none=True)
+                starred_repositories=[
+                    _create_gh_link(d['github_user'], d['github_repo'])
+                    for d in json['summary_fields']['starred']],
+                subscribed_repositories=[
+                    _create_gh_link(d['github_user'], d['github_repo'])
+                    for d in json['summary_fields']['subscriptions']],
 
-        return User(**attrs)
+                creation_date=_parse_date(json['created'], False),
+                modification_date=_parse_date(json['modified'], True))
 
 
 
@@ -798,12 +879,26 @@ def _create_all(
         entity_type: Type[_EntityType],
         **extra_args: Any
 ) -> Dict[int, _EntityType]:
-    entities = [
+    entities = (
             entity_type.from_galaxy_json(entity_json, **extra_args)  # type: ignore[call-arg]
-            for entity_json in json_entities]
-    return {e.entity_id: e for e in entities}  # type: ignore[attr-defined]
-
-@attr.s(auto_attribs=True)
+            for entity_json in json_entities)
+    return {_get_entity_id(e): e for e in entities}
+
+
+# Entity type names used in the dataset index, mapped to the attribute name
+# of their collection and their type.
+_INDEX_ENTITY_TYPES: Dict[str, Tuple[str, Type[GalaxyEntity]]] = {
+    'CommunitySurvey': ('community_surveys', CommunitySurvey),
+    'Content': ('content', Content),
+    'Namespace': ('namespaces', Namespace),
+    'ProviderNamespace': ('provider_namespaces', ProviderNamespace),
+    'Repository': ('repositories', Repository),
+    'Role': ('roles', Role),
+    'Tag': ('tags', Tag),
+    'User': ('users', User),
+}
+
+@attr.s(auto_attribs=True, slots=True)
 class GalaxyMetadata(Model):
     """Model for Galaxy metadata."""
 
@@ -820,16 +915,24 @@ class GalaxyMetadata(Model):
     @classmethod
     def from_metamap(cls, meta_map: MetadataMap) -> GalaxyMetadata:
         attrs: Dict[str, Dict[int, GalaxyEntity]] = {}
-        attrs['community_surveys'] = _create_all(
+        surveys = _create_all(
                 meta_map.community_surveys.values(), CommunitySurvey)
+        attrs['community_surveys'] = surveys  # type: ignore[assignment]
         attrs['content'] = _create_all(
                 meta_map.content.values(), Content)
         attrs['namespaces'] = _create_all(
                 meta_map.namespaces.values(), Namespace)
         attrs['provider_namespaces'] = _create_all(
                 meta_map.provider_namespaces.values(), ProviderNamespace)
+        surveys_by_repo: Dict[int, List[XrefID]] = {}
+        for srv in surveys.values():
+            surveys_by_repo.setdefault(
+                    srv.reviewed_repository.entity_id, []).append(
+                        XrefID._of_type_name(
+                            'CommunitySurvey', srv.entity_id))
         attrs['repositories'] = _create_all(
-                meta_map.repositories.values(), Repository, surveys=attrs['community_surveys'])
+                meta_map.repositories.values(), Repository,
+                surveys_by_repo=surveys_by_repo)
         attrs['tags'] = _create_all(meta_map.tags.values(), Tag)
         # attrs['users'] = _create_all(meta_map.users.values(), User)
 
@@ -853,36 +956,46 @@ class GalaxyMetadata(Model):
         return 'dummy'  # Unused
 
     def _dump_dict(self, dct: Mapping[int, GalaxyEntity], file: Path) -> None:
-        file.write_text(
-                yaml.dump(CONVERTER.unstructure(dct), sort_keys=True, Dumper=Dumper))
+        # Stream the entities to the file one by one, rather than
+        # unstructuring and encoding the whole collection in memory.
+        with file.open('wb') as f:
+            f.write(b'{')
+            for idx, entity_id in enumerate(sorted(dct)):
+                entry = json_dumps(
+                        {entity_id: CONVERTER.unstructure(dct[entity_id])},
+                        pretty=True)
+                # Strip the braces of the single-entry object, the entry
+                # itself is already indented.
+                f.write((b',' if idx else b'') + entry[1:-2])
+            f.write(b'\n}' if dct else b'}')
 
     def dump(self, directory: Path) -> Path:
         self._dump_dict(
-                self.community_surveys, directory / 'CommunitySurveys.yaml')
+                self.community_surveys, directory / 'CommunitySurveys.json')
         self._dump_dict(
-                self.content, directory / 'Content.yaml')
+                self.content, directory / 'Content.json')
         self._dump_dict(
-                self.namespaces, directory / 'Namespaces.yaml')
+                self.namespaces, directory / 'Namespaces.json')
         self._dump_dict(
-                self.provider_namespaces, directory / 'ProviderNamespaces.yaml')
+                self.provider_namespaces, directory / 'ProviderNamespaces.json')
         self._dump_dict(
-                self.repositories, directory / 'Repositories.yaml')
+                self.repositories, directory / 'Repositories.json')
         self._dump_dict(
-                self.roles, directory / 'Roles.yaml')
+                self.roles, directory / 'Roles.json')
         self._dump_dict(
-                self.tags, directory / 'Tags.yaml')
+                self.tags, directory / 'Tags.json')
         # self._dump_dict(
-        #        self.users, directory / 'Users.yaml')
+        #        self.users, directory / 'Users.json')
 
         idx = {
-            'CommunitySurvey': 'CommunitySurveys.yaml',
-            'Content': 'Content.yaml',
-            'Namespace': 'Namespaces.yaml',
-            'ProviderNamespace': 'ProviderNamespaces.yaml',
-            'Repository': 'Repositories.yaml',
-            'Role': 'Roles.yaml',
-            'Tag': 'Tags.yaml',
-            # 'User': 'Users.yaml',
+            'CommunitySurvey': 'CommunitySurveys.json',
+            'Content': 'Content.json',
+            'Namespace': 'Namespaces.json',
+            'ProviderNamespace': 'ProviderNamespaces.json',
+            'Repository': 'Repositories.json',
+            'Role': 'Roles.json',
+            'Tag': 'Tags.json',
+            # 'User': 'Users.json',
         }
         idx_path = (directory / 'index.yaml')
         idx_path.write_text(yaml.dump(idx))
@@ -890,9 +1003,12 @@ class GalaxyMetadata(Model):
 
     @classmethod
     def _load_dict(cls, path: Path, entity_type: Type[_EntityType]) -> Dict[int, _EntityType]:
-        return CONVERTER.structure(
-                yaml.load(path.read_text(), Loader=Loader),
-                Dict[int, entity_type])  # type: ignore[valid-type]
+        cached = _load_structured_cache(path)
+        if cached is not None:
+            return cached
+        entities = _get_dict_structurer(entity_type)(_load_entity_file(path))
+        _dump_structured_cache(path, entities)
+        return entities
 
     @classmethod
     def load(cls, id: str, direc: Path) -> 'GalaxyMetadata':
@@ -900,57 +1016,234 @@ class GalaxyMetadata(Model):
         print('loaded')
 
         attrs: Dict[str, Any] = {}
-        for etype, efile in idx.items():
-            etype_attr = capitalized_to_underscored(efile.replace('.yaml', ''))
-            attrs[etype_attr] = cls._load_dict(
-                    direc / efile, globals()[etype])
+        for etype_str, efile in idx.items():
+            etype_attr, etype = _INDEX_ENTITY_TYPES[etype_str]
+            attrs[etype_attr] = cls._load_dict(direc / efile, etype)
 
         return cls(**attrs)
 
+    def preload(self) -> None:
+        """Load all lazily loaded entity files concurrently.
+
+        Entities are still structured on access.
+        """
+        lazy_dicts = [
+                dct for dct in (
+                    getattr(self, field.name) for field in attr.fields(type(self)))
+                if isinstance(dct, _LazyDict)]
+        with concurrent.futures.ThreadPoolExecutor() as pool:
+            for _ in pool.map(_LazyDict._ensure_loaded, lazy_dicts):
+                pass
+
     @classmethod
     def lazy_load(cls, id: str, direc: Path) -> 'GalaxyMetadata':
         idx = yaml.safe_load((direc / 'index.yaml').read_text())
 
-        try:
-            attrs: Dict[str, Any] = {}
-            for etype_str, efile in idx.items():
-                etype_attr = capitalized_to_underscored(efile.replace('.yaml', ''))
-                if etype_attr == 'users':
-                    continue
-                attrs[etype_attr] = _LazyDict(
-                        direc / efile, globals()[etype_str])
-        except Exception as e:
-            print(e)
-            raise
+        attrs: Dict[str, Any] = {}
+        for etype_str, efile in idx.items():
+            etype_attr, etype = _INDEX_ENTITY_TYPES[etype_str]
+            if etype_attr == 'users':
+                continue
+            attrs[etype_attr] = _LazyDict(direc / efile, etype)
 
         return cls(**attrs)
 
 
-class _LazyDict(Mapping[int, _EntityType]):
+@functools.lru_cache(maxsize=None)
+def _get_entity_structurer(
+        entity_type: Type[_EntityType]
+) -> Callable[[Any, Type[_EntityType]], _EntityType]:
+    """Get a function structuring a single entity.
+
+    The function is generated once per type, rather than being dispatched
+    for every entity.
+    """
+    return cattr.gen.make_dict_structure_fn(  # type: ignore[no-any-return]
+            entity_type, CONVERTER)
+
+
+def _get_dict_structurer(
+        entity_type: Type[_EntityType]
+) -> Callable[[Mapping[str, Any]], Dict[int, _EntityType]]:
+    """Get a function structuring a loaded entity file."""
+    structure_entity = _get_entity_structurer(entity_type)
+
+    def structure(raw: Mapping[str, Any]) -> Dict[int, _EntityType]:
+        # Build the dict in one go from the keys and structured values.
+        return dict(zip(
+                map(int, raw),
+                [structure_entity(entity, entity_type)
+                 for entity in raw.values()]))
+
+    return structure
+
+
+# Caches derived from dataset files are kept outside of the dataset.
+_CACHE_DIR = Path(
+        os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache',
+        'voyager')
+
+
+def _cache_path(path: Path, suffix: str) -> Path:
+    """Get the path of a cache derived from a dataset file."""
+    path_hash = hashlib.sha256(str(path.resolve()).encode()).hexdigest()
+    return _CACHE_DIR / f'{path.stem}-{path_hash[:16]}{suffix}'
+
+
+@functools.lru_cache(maxsize=None)
+def _get_schema_hash() -> str:
+    """Get a hash of the layout of the models in this module.
+
+    Pickled models can only be loaded into the layout they were dumped
+    with, so any change to the classes or their fields changes the hash.
+    """
+    layout: List[Any] = [XrefID.__qualname__, XrefID.__slots__]
+    for obj in list(globals().values()):
+        if not (isinstance(obj, type) and obj.__module__ == __name__
+                and attr.has(obj)):
+            continue
+        layout.append(obj.__qualname__)
+        layout.extend(
+                (field.name, str(field.type),
+                 getattr(field.converter, '__qualname__', None))
+                for field in attr.fields(obj))
+    return hashlib.sha256(repr(layout).encode()).hexdigest()
+
+
+def _get_structured_cache_key(path: Path) -> Tuple[str, int, int]:
+    stat = path.stat()
+    return (_get_schema_hash(), stat.st_mtime_ns, stat.st_size)
+
+
+def _load_structured_cache(path: Path) -> Optional[Dict[int, Any]]:
+    """Load the structured entities of an entity file from its cache.
+
+    Returns None if there is no cache, or if it was created for a different
+    version of the file or of the models.
+    """
+    cache = _cache_path(path, '.pickle')
+    try:
+        with cache.open('rb') as f:
+            # The key is pickled separately, so that stale entities aren't
+            # unpickled at all.
+            if pickle.load(f) != _get_structured_cache_key(path):
+                return None
+            return cast(Dict[int, Any], pickle.load(f))
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        # Corrupt caches, or ones pickled with models that no longer exist,
+        # are simply rebuilt.
+        print(f'Ignoring unusable cache {cache}: {exc!r}')
+        return None
+
+
+def _dump_structured_cache(path: Path, entities: Dict[int, Any]) -> None:
+    cache = _cache_path(path, '.pickle')
+    tmp_cache = cache.with_name(cache.name + '.tmp')
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        with tmp_cache.open('wb') as f:
+            pickle.dump(
+                    _get_structured_cache_key(path), f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(entities, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_cache.replace(cache)
+    except OSError:
+        # Cache directory not writable, don't cache.
+        pass
+
+
+def _load_entity_file(path: Path) -> Any:
+    if path.suffix == '.json':
+        return json_load_file(path)
+    # Datasets dumped before the switch to JSON. The parsed YAML is cached as
+    # JSON, so that it only needs to be parsed once.
+    cache = _cache_path(path, '.yaml.json')
+    if cache.exists() and cache.stat().st_mtime >= path.stat().st_mtime:
+        return json_load_file(cache)
+    # Let the loader stream the binary file rather than reading it whole.
+    with path.open('rb') as f:
+        content = yaml.load(f, Loader=Loader)
+    tmp_cache = cache.with_name(cache.name + '.tmp')
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp_cache.write_bytes(json_dumps(content))
+        tmp_cache.replace(cache)
+    except OSError:
+        # Cache directory not writable, don't cache.
+        pass
+    return content
+
+
+class _LazyDict(Generic[_EntityType]):
+    """Mapping loading its file on first access.
+
+    Entities are only structured when they are looked up, so iterating over
+    the IDs or accessing a few entities doesn't structure the whole file.
+    Lookups are implemented directly instead of through the Mapping mixins,
+    the class is registered as a virtual Mapping subclass.
+    """
+
     def __init__(self, path: Path, etype: Type[_EntityType]) -> None:
-        self._storage: Optional[Dict[int, _EntityType]] = None
+        self._raw: Optional[Dict[int, Any]] = None
+        self._structured: Dict[int, _EntityType] = {}
         self._file_path = path
         self._etype = etype
 
 
-    def _ensure_loaded(self) -> None:
-        if self._storage is None:
-            self._storage = CONVERTER.structure(
-                    yaml.load(self._file_path.read_text(), Loader=Loader),
-                    Dict[int, self._etype])  # type: ignore[name-defined]
+    def _ensure_loaded(self) -> Dict[int, Any]:
+        raw = self._raw
+        if raw is None:
+            cached = _load_structured_cache(self._file_path)
+            if cached is not None:
+                # Already structured, only the keys of the raw dict are used.
+                self._structured = self._raw = cached
+                return cached
+            content = _load_entity_file(self._file_path)
+            raw = self._raw = dict(zip(map(int, content), content.values()))
+        return raw
 
 
     def __len__(self) -> int:
-        self._ensure_loaded()
-        assert self._storage is not None
-        return len(self._storage)
+        return len(self._ensure_loaded())
 
     def __getitem__(self, key: int) -> _EntityType:
-        self._ensure_loaded()
-        assert self._storage is not None
-        return self._storage[key]
+        raw = self._ensure_loaded()
+        try:
+            return self._structured[key]
+        except KeyError:
+            pass
+        entity = _get_entity_structurer(self._etype)(raw[key], self._etype)
+        self._structured[key] = entity
+        return entity
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._ensure_loaded()
 
     def __iter__(self) -> Iterator[int]:
-        self._ensure_loaded()
-        assert self._storage is not None
-        return iter(self._storage)
+        return iter(self._ensure_loaded())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, collections.abc.Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def get(
+            self, key: int, default: Optional[_EntityType] = None
+    ) -> Optional[_EntityType]:
+        if key not in self._ensure_loaded():
+            return default
+        return self[key]
+
+    def keys(self) -> KeysView[int]:
+        return self._ensure_loaded().keys()
+
+    def values(self) -> ValuesView[_EntityType]:
+        return collections.abc.ValuesView(self)  # type: ignore[arg-type]
+
+    def items(self) -> ItemsView[int, _EntityType]:
+        return collections.abc.ItemsView(self)  # type: ignore[arg-type]
+
+
+collections.abc.Mapping.register(_LazyDict)
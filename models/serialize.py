@@ -1,28 +1,113 @@
 """Serialization utilities."""
-from typing import cast
+from typing import Any, Callable, Optional, Union, cast
 
+import functools
+import json
+import mmap
 import operator
 
+from datetime import datetime
 from pathlib import Path, PurePosixPath
 
 import cattr
 import pendulum
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 CONVERTER = cattr.GenConverter()  # type: ignore[attr-defined]
 
+# Paths and timestamps are immutable and recur across structured objects, so
+# share the instances for repeated values rather than building new ones.
+_INTERN_CACHE_SIZE = 4096
+
+_intern_path = functools.lru_cache(maxsize=_INTERN_CACHE_SIZE)(Path)
+_intern_pure_posix_path = functools.lru_cache(
+        maxsize=_INTERN_CACHE_SIZE)(PurePosixPath)
+
 # Customize converter for paths
-CONVERTER.register_structure_hook(Path, lambda p, _: Path(p))
+CONVERTER.register_structure_hook(Path, lambda p, _: _intern_path(p))
 CONVERTER.register_unstructure_hook(Path, operator.methodcaller('as_posix'))
 
-CONVERTER.register_structure_hook(PurePosixPath, lambda p, _: PurePosixPath(p))
+CONVERTER.register_structure_hook(
+        PurePosixPath, lambda p, _: _intern_pure_posix_path(p))
 CONVERTER.register_unstructure_hook(
         PurePosixPath, operator.methodcaller('as_posix'))
 
 
+_fromisoformat = datetime.fromisoformat
+
+
+def parse_datetime(ts: str) -> pendulum.DateTime:
+    """Parse an RFC 3339 timestamp.
+
+    Uses the stdlib's C parser when it understands the timestamp and falls
+    back to pendulum's parser otherwise.
+    """
+    try:
+        return pendulum.instance(_fromisoformat(ts.replace('Z', '+00:00')))
+    except ValueError:
+        return cast(pendulum.DateTime, pendulum.parse(ts))
+
+
+# Like parse_datetime, but shares the instances of recently parsed timestamps.
+intern_datetime = functools.lru_cache(
+        maxsize=_INTERN_CACHE_SIZE)(parse_datetime)
+
 # Customize converter for timestamps
 CONVERTER.register_structure_hook(
-        pendulum.DateTime,
-        lambda ts, _: cast(pendulum.DateTime, pendulum.parse(ts)))
+        pendulum.DateTime, lambda ts, _: intern_datetime(ts))
 CONVERTER.register_unstructure_hook(
         pendulum.DateTime, operator.methodcaller('to_rfc3339_string'))
 
+CONVERTER.register_structure_hook(
+        datetime, lambda ts, _: datetime.fromisoformat(ts))
+CONVERTER.register_unstructure_hook(
+        datetime, operator.methodcaller('isoformat'))
+
+
+def json_loads(content: Union[str, bytes]) -> Any:
+    """Parse JSON content, using orjson if it's available."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def json_load_file(path: Path) -> Any:
+    """Parse a JSON file.
+
+    With orjson, the file is memory-mapped and parsed in place rather than
+    being read into an intermediate bytes object first.
+    """
+    with path.open('rb') as f:
+        if orjson is None or not path.stat().st_size:
+            return json_loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                memoryview(mapped) as view:
+            return orjson.loads(view)
+
+
+def json_dumps(
+        obj: object, pretty: bool = False,
+        default: Optional[Callable[[Any], Any]] = None
+) -> bytes:
+    """Serialize to UTF-8 encoded JSON, using orjson if it's available.
+
+    Pretty-printed output is indented with two spaces and has sorted keys.
+    `default` is called for objects that cannot be serialized natively.
+    Like the stdlib, non-string keys are converted to strings.
+    """
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=default, option=options)
+    if pretty:
+        return json.dumps(
+                obj, indent=2, sort_keys=True, ensure_ascii=False,
+                default=default).encode()
+    return json.dumps(
+            obj, separators=(',', ':'), ensure_ascii=False,
+            default=default).encode()
@@ -5,6 +5,7 @@ from typing import (
     Any,
     Collection,
     Callable,
+    ClassVar,
     Dict,
     Final,
     Generic,
@@ -12,6 +13,7 @@ from typing import (
     Mapping,
     Optional,
     Sequence,
+    Set,
     Tuple,
     Type,
     TypeVar,
@@ -24,6 +26,7 @@ from typing import (
 )
 
 from abc import ABC, abstractmethod
+from functools import cached_property, lru_cache
 from itertools import chain, product
 from operator import attrgetter, itemgetter
 from textwrap import indent
@@ -34,7 +37,7 @@ from . import base, diff, mixins
 # Backup, since it clashes in method definition type hints if the diff method
 # is already defined in the class body.
 from . import diff as diff_mod
-from .types import AnsTaskOrBlock, Value, convert_to_native
+from .types import AnsTaskOrBlock, KwList, Value, convert_to_native
 from .provenance import GraphvizMixin, SMGraph, pformat
 
 if TYPE_CHECKING:
@@ -45,6 +48,23 @@ if TYPE_CHECKING:
 #       logic for each object type?
 
 
+@lru_cache(maxsize=None)
+def _diff_type(
+        obj_type: type, suffix: str, *name_replacements: Tuple[str, str]
+) -> Any:
+    """Get the diff type for an object type, e.g. TaskAddition for Task.
+
+    `name_replacements` are applied to the object type's name first. Cached
+    since it's looked up for each diff that gets created.
+    """
+    type_name = obj_type.__name__
+    for old, new in name_replacements:
+        type_name = type_name.replace(old, new)
+    return getattr(diff, type_name + suffix)
+
+
+_TASK_LIST_NAMES: Final = frozenset({'block', 'rescue', 'always'})
+
 _FileType = TypeVar(
         '_FileType', bound='ContainerFile')  # type: ignore[type-arg]
 
@@ -110,27 +130,41 @@ class ContainerFile(
         # relocation
         # Calculate a similarity score for each pair of added and removed files
         # so that we can prioritize the absolute best matches first.
+        if not added or not removed:
+            # Nothing can have been relocated
+            return added, removed, []
+
         relocations: List[Tuple[_FileType, _FileType]] = []
-        candidates = product(added, removed)
-        sims = [(addf, remf, calc_sim(remf, addf))
-                for addf, remf in candidates]
-        # See DiffableMixin._diff_multiple_internal
-        sims = sorted(sims[::-1], key=itemgetter(2), reverse=True)
-        for addf, remf, score in sims:
-            if score < diff.SIMILARITY_THRESHOLD:
-                # Reached threshold, no good matches anymore
-                break
-            if not added or not removed:
+        candidates = product(enumerate(added), enumerate(removed))
+        sims = [(add_idx, rem_idx, calc_sim(remf, addf))
+                for (add_idx, addf), (rem_idx, remf) in candidates]
+        # Only pairs above the threshold can be matched, so don't bother
+        # sorting the others.
+        # See DiffableMixin._diff_multiple_internal for the reversal.
+        sims = sorted(
+                (sim for sim in reversed(sims)
+                 if sim[2] >= diff.SIMILARITY_THRESHOLD),
+                key=itemgetter(2), reverse=True)
+        # Track matched files by index rather than removing them from the
+        # lists, which would be linear for each match and membership check.
+        added_matched = [False] * len(added)
+        removed_matched = [False] * len(removed)
+        num_unmatched = min(len(added), len(removed))
+        for add_idx, rem_idx, _ in sims:
+            if not num_unmatched:
                 # All processed
                 break
-            if addf not in added or remf not in removed:
+            if added_matched[add_idx] or removed_matched[rem_idx]:
                 # Already matched previously
                 continue
-            added.remove(addf)
-            removed.remove(remf)
-            relocations.append((remf, addf))
+            added_matched[add_idx] = removed_matched[rem_idx] = True
+            num_unmatched -= 1
+            relocations.append((removed[rem_idx], added[add_idx]))
 
-        return added, removed, relocations
+        return (
+                [f for f, matched in zip(added, added_matched) if not matched],
+                [f for f, matched in zip(removed, removed_matched) if not matched],
+                relocations)
 
     @classmethod
     def _create_file_relocation_diff(
@@ -138,7 +172,7 @@ class ContainerFile(
     ) -> diff_mod.Relocation:
         file_relocation_t = cast(
                 Type[diff.Relocation],
-                getattr(diff, f'{cls.__name__}Relocation'))
+                _diff_type(cls, 'Relocation'))
         return file_relocation_t(
                 obj_id=f1.file_name, prev_loc=f1.file_name,
                 new_loc=f2.file_name)
@@ -146,20 +180,20 @@ class ContainerFile(
     def _create_file_addition(self) -> Sequence[diff_mod.Addition]:
         file_addition_t = cast(
                 Type[diff.Addition],
-                getattr(diff, f'{self.__class__.__name__}Addition'))
-        diffs = [file_addition_t(obj_id=self.file_name, add_val=self)]
-        for e in self:
-            diffs.extend(self._create_element_addition(e))
-        return diffs
+                _diff_type(type(self), 'Addition'))
+        return [
+                file_addition_t(obj_id=self.file_name, add_val=self),
+                *chain.from_iterable(
+                    map(self._create_element_addition, self))]
 
     def _create_file_removal(self) -> Sequence[diff_mod.Removal]:
         file_removal_t = cast(
                 Type[diff.Removal],
-                getattr(diff, f'{self.__class__.__name__}Removal'))
-        diffs = [file_removal_t(obj_id=self.file_name, rem_val=self)]
-        for e in self:
-            diffs.extend(self._create_element_removal(e))
-        return diffs
+                _diff_type(type(self), 'Removal'))
+        return [
+                file_removal_t(obj_id=self.file_name, rem_val=self),
+                *chain.from_iterable(
+                    map(self._create_element_removal, self))]
 
     @abstractmethod
     def _create_element_addition(
@@ -174,6 +208,8 @@ class ContainerFile(
         ...
 
 
+_get_var_name_and_value = attrgetter('name', 'value')
+
 _AVType = TypeVar('_AVType', 'AbstractVariable[DefaultVarFile]', 'AbstractVariable[RoleVarFile]')
 _CVType = TypeVar('_CVType', 'DefaultVariable', 'RoleVariable')
 _AVFile = TypeVar(
@@ -200,18 +236,23 @@ class AbstractVariableFile(
     def unstructure(self) -> Dict[str, Any]:
         return {
             'file_name': self.file_name,
-            'content': {var.name: var.value for var in self}
+            'content': dict(map(_get_var_name_and_value, self))
         }
 
+    @cached_property
+    def _sorted_vars(self) -> Sequence[_CVType]:
+        # Files aren't modified after construction, and are diffed against
+        # many others when matching relocations, so only sort once.
+        return sorted(self, key=attrgetter('name'))
+
     def diff(
             self: _AVFile, other: _AVFile
     ) -> Sequence[diff_mod.Diff]:
         if not isinstance(other, type(self)):
             raise NotImplementedError
 
-        var_type_name = self.__class__.__name__.replace('File', 'iable')
-        var_added_t = getattr(diff, f'{var_type_name}Addition')
-        var_removed_t = getattr(diff, f'{var_type_name}Removal')
+        var_added_t = _diff_type(type(self), 'Addition', ('File', 'iable'))
+        var_removed_t = _diff_type(type(self), 'Removal', ('File', 'iable'))
 
         # This has no elements => All variables in other are added
         if len(self) == 0:
@@ -226,12 +267,14 @@ class AbstractVariableFile(
                 for v in self]
 
         # Sort both variable lists by name and try to match in order
-        vars1 = list(sorted(self, key=attrgetter('name')))
-        vars2 = list(sorted(other, key=attrgetter('name')))
+        vars1 = self._sorted_vars
+        vars2 = other._sorted_vars
+        num_vars1 = len(vars1)
+        num_vars2 = len(vars2)
 
         diffs: List[diff.Diff] = []
         i1 = i2 = 0
-        while i1 < len(vars1) and i2 < len(vars2):
+        while i1 < num_vars1 and i2 < num_vars2:
             v1 = vars1[i1]
             v2 = vars2[i2]
             if v1.name == v2.name:
@@ -254,14 +297,11 @@ class AbstractVariableFile(
                     # Analogous for v2: Definitely added
                     diffs.append(var_added_t(obj_id=v2.id, add_val=v2))
                     i2 += 1
-        while i1 < len(vars1):
-            v1 = vars1[i1]
-            diffs.append(var_removed_t(obj_id=v1.id, rem_val=v1))
-            i1 += 1
-        while i2 < len(vars2):
-            v2 = vars2[i2]
-            diffs.append(var_added_t(obj_id=v2.id, add_val=v2))
-            i2 += 1
+        # Whatever remains in either list is unmatched.
+        diffs.extend(
+                var_removed_t(obj_id=v1.id, rem_val=v1) for v1 in vars1[i1:])
+        diffs.extend(
+                var_added_t(obj_id=v2.id, add_val=v2) for v2 in vars2[i2:])
 
         return diffs
 
@@ -275,15 +315,21 @@ class AbstractVariableFile(
         """
         diffs = self.diff(other)
         max_num_vars = max(len(self), len(other))
-        num_added = sum(1 for d in diffs if isinstance(d, diff.Addition))
-        num_removed = sum(1 for d in diffs if isinstance(d, diff.Removal))
+        num_added = num_removed = num_edited = 0
+        for d in diffs:
+            if isinstance(d, diff.Addition):
+                num_added += 1
+            elif isinstance(d, diff.Removal):
+                num_removed += 1
+            elif isinstance(d, diff.Edit):
+                num_edited += 1
         assert (len(other) - num_added) == (len(self) - num_removed)
         num_shared = len(self) - num_removed
 
         # Similarity is the proportion of shared variables among the files
         # Penalize for an edited value
         total_sim = float(num_shared)
-        total_sim -= sum(.25 for d in diffs if isinstance(d, diff.Edit))
+        total_sim -= .25 * num_edited
         if not max_num_vars:
             return (1.0, diffs)
         return (total_sim / max_num_vars, diffs)
@@ -291,20 +337,18 @@ class AbstractVariableFile(
     def _create_element_addition(
             self, e: _CVType
     ) -> Sequence[diff_mod.Addition]:
-        var_type_name = self.__class__.__name__.replace('File', 'iable')
         var_addition_t = cast(
                 Type[diff.Addition],
-                getattr(diff, f'{var_type_name}Addition'))
+                _diff_type(type(self), 'Addition', ('File', 'iable')))
         assert isinstance(e, AbstractVariable)
         return [var_addition_t(obj_id=e.id, add_val=e)]
 
     def _create_element_removal(
             self, e: _CVType
     ) -> Sequence[diff_mod.Removal]:
-        var_type_name = self.__class__.__name__.replace('File', 'iable')
         var_removal_t = cast(
                 Type[diff.Removal],
-                getattr(diff, f'{var_type_name}Removal'))
+                _diff_type(type(self), 'Removal', ('File', 'iable')))
         assert isinstance(e, AbstractVariable)
         return [var_removal_t(obj_id=e.id, rem_val=e)]
 
@@ -313,8 +357,7 @@ class AbstractVariableFile(
             cls, old_diffs: Sequence[diff_mod.Diff]
     ) -> Sequence[diff_mod.Diff]:
         # Preprocess: Extract additions and removals
-        var_type_name = cls.__name__.replace('File', 'iable')
-        var_relocation_t = getattr(diff, f'{var_type_name}Relocation')
+        var_relocation_t = _diff_type(cls, 'Relocation', ('File', 'iable'))
 
         new_diffs: List[diff.Diff] = []
         additions: List[diff.Addition] = []
@@ -331,9 +374,17 @@ class AbstractVariableFile(
             else:
                 new_diffs.append(d)
 
+        # Index the removals by variable name, so that additions don't need to
+        # scan all removals for a match.
+        removals_by_name: Dict[str, List[diff.Removal]] = {}
+        for r in removals:
+            assert isinstance(r.removed_value, AbstractVariable)
+            removals_by_name.setdefault(r.removed_value.name, []).append(r)
+
+        matched_removals: Set[int] = set()
         ad: diff.Addition  # Helping mypy
         for ad in additions:
-            if (rd := cls._find_matching_removal(ad, removals)) is not None:
+            if (rd := cls._find_matching_removal(ad, removals_by_name)) is not None:
                 r, ds = rd
                 assert isinstance(r.removed_value, AbstractVariable)
                 assert isinstance(ad.added_value, AbstractVariable)
@@ -342,26 +393,27 @@ class AbstractVariableFile(
                         prev_loc=r.removed_value.id,
                         new_loc=ad.added_value.id))
                 new_diffs.extend(ds)
-                removals.remove(r)
+                matched_removals.add(id(r))
             else:
                 # No matching deleted var found in another file, it's truly new
                 new_diffs.append(ad)
-        new_diffs.extend(removals)
+        new_diffs.extend(r for r in removals if id(r) not in matched_removals)
         return new_diffs
 
     @classmethod
     def _find_matching_removal(
             cls,
             addition: diff_mod.Addition,
-            removals: Sequence[diff_mod.Removal]
+            removals_by_name: Mapping[str, List[diff_mod.Removal]]
     ) -> Optional[Tuple[diff_mod.Removal, Sequence[diff_mod.Diff]]]:
-        """Find a removal matching the given addition in the list."""
+        """Find and take a removal matching the given addition."""
         assert isinstance(addition.added_value, AbstractVariable)
-        for r in removals:
-            assert isinstance(r.removed_value, AbstractVariable)
-            if r.removed_value.name == addition.added_value.name:
-                return (r, r.removed_value.diff(addition.added_value))
-        return None
+        candidates = removals_by_name.get(addition.added_value.name)
+        if not candidates:
+            return None
+        # Take the first unmatched removal of the variable.
+        r = candidates.pop(0)
+        return (r, r.removed_value.diff(addition.added_value))
 
     @classmethod
     def diff_multiple(
@@ -377,13 +429,21 @@ class AbstractVariableFile(
         for (f1, f2) in matched:
             diffs.extend(f1.diff(f2))
 
-        # Find file relocations
+        # Find file relocations. Keep the diffs calculated for the similarity
+        # scores, so that the relocated files don't need to be diffed again.
+        sim_results: Dict[
+                Tuple[int, int], Tuple[float, Sequence[diff_mod.Diff]]] = {}
+
+        def calc_sim(f1: _AVFile, f2: _AVFile) -> float:
+            result = sim_results[id(f1), id(f2)] = f1.similarity_score(f2)
+            return result[0]
+
         added, removed, relocated = cls._match_file_relocations(
-                added, removed, lambda f1, f2: f1.similarity_score(f2)[0])
+                added, removed, calc_sim)
 
         # Diff the relocated files and add a file relocation diff.
         for f1, f2 in relocated:
-            diffs.extend(f1.diff(f2))
+            diffs.extend(sim_results[id(f1), id(f2)][1])
             diffs.append(cls._create_file_relocation_diff(f1, f2))
 
         # Create file additions and removals, as well as additions and removals
@@ -427,7 +487,7 @@ class AbstractVariable(
         if self.value == other.value:
             return []
         # Changed value => DefaultVariableEdit/ConstantVariableEdit
-        return [getattr(diff, self.__class__.__name__ + 'Edit')(
+        return [_diff_type(type(self), 'Edit')(
                 obj_id=self.id, prev_val=self.value, new_val=other.value)]
 
     def unstructure(self) -> Dict[str, Value]:
@@ -474,8 +534,17 @@ class AbstractBlockFile(
             'content': [obj.unstructure() for obj in self]
         }
 
+    @cached_property
+    def _index_by_id(self) -> Dict[int, int]:
+        # Files aren't modified after construction. The first occurrence wins,
+        # like with index().
+        index_by_id: Dict[int, int] = {}
+        for idx, el in enumerate(self):
+            index_by_id.setdefault(id(el), idx)
+        return index_by_id
+
     def get_path_to(self, ch: _ABType) -> str:
-        return f'{self.file_name}[{self.index(ch)}]'
+        return f'{self.file_name}[{self._index_by_id[id(ch)]}]'
 
     def diff(
             self: _ABFile, other: _ABFile
@@ -522,8 +591,7 @@ class AbstractBlockFile(
         diffs.extend(chain(*(rf._create_file_removal() for rf in removed)))
 
         # Match all relocated blocks and tasks
-        diffs = cls._match_block_relocations(diffs)
-        diffs = cls._match_task_relocations(diffs)
+        diffs = cls._match_block_and_task_relocations(diffs)
 
         # Remove redundant relocations, e.g. relocations of a task if its
         # parent block was relocated too
@@ -560,93 +628,93 @@ class AbstractBlockFile(
     def _create_element_relocation(
             cls, e1: _CBType, e2: _CBType
     ) -> diff_mod.Relocation:
-        block_type_name = cls.get_block_type_name()
+        block_type = cls._get_content_types()[0]
         addition_t = cast(
-                Type[diff.Relocation],
-                getattr(diff, f'{block_type_name}Relocation'))
+                Type[diff.Relocation], _diff_type(block_type, 'Relocation'))
         return addition_t(obj_id=e1.id, prev_loc=e1.id, new_loc=e2.id)
 
     @classmethod
-    def _match_block_relocations(
+    @lru_cache(maxsize=None)
+    def _get_content_types(cls) -> Tuple[Any, Any, Any, Any]:
+        """Get the block type, block diff type, task type and task diff type.
+
+        Resolved once per file type.
+        """
+        # Actual type of the block is not in this module, import it here to
+        # prevent cyclic imports
+        from . import role
+        block_type = getattr(role, cls.get_block_type_name())
+        task_type = block_type._get_task_type()
+        return (
+                block_type, _diff_type(block_type, 'Diff'),
+                task_type, _diff_type(task_type, 'Diff'))
+
+    @classmethod
+    def _match_block_and_task_relocations(
             cls, old_diffs: Sequence[diff_mod.Diff]
     ) -> List[diff_mod.Diff]:
-        # Preprocess: Extract diffs to blocks
+        # Preprocess: Extract diffs to blocks and tasks in a single pass
         block_diffs: List[diff.Diff] = []
+        task_diffs: List[diff.Diff] = []
         other_diffs: List[diff.Diff] = []
 
-        block_type_name = cls.get_block_type_name()
-        from . import role
-        block_type = getattr(role, block_type_name)
-        block_diff_t = getattr(diff, f'{block_type_name}Diff')
+        block_type, block_diff_t, task_type, task_diff_t = (
+                cls._get_content_types())
 
         for d in old_diffs:
             if isinstance(d, block_diff_t):
                 block_diffs.append(d)
+            elif isinstance(d, task_diff_t):
+                task_diffs.append(d)
             else:
                 other_diffs.append(d)
 
-        return list(chain(
-                other_diffs, block_type.match_relocations(block_diffs)))
-
-    @classmethod
-    def _match_task_relocations(
-            cls, old_diffs: Sequence[diff_mod.Diff]
-    ) -> List[diff_mod.Diff]:
-        # Preprocess: Extract diffs to blocks
-        task_diffs: List[diff.Diff] = []
-        other_diffs: List[diff.Diff] = []
-
-        block_type_name = cls.get_block_type_name()
-        from . import role
-        block_type = getattr(role, block_type_name)
-        task_type = block_type._get_task_type()
-        task_diff_t = getattr(diff, f'{task_type.__name__}Diff')
-
-        for d in old_diffs:
+        # Blocks first: Relocated blocks get diffed, which can lead to new task
+        # diffs that need to be matched too.
+        for d in block_type.match_relocations(block_diffs):
             if isinstance(d, task_diff_t):
                 task_diffs.append(d)
             else:
                 other_diffs.append(d)
 
-        return list(chain(
-                other_diffs, task_type.match_relocations(task_diffs)))
+        return [*other_diffs, *task_type.match_relocations(task_diffs)]
 
     @classmethod
     def _remove_redundant_relocations(
             cls, old_diffs: Sequence[diff_mod.Diff]
     ) -> Sequence[diff_mod.Diff]:
         # Take all relocations, except for file relocations (these cannot be
-        # redundant)
-        relos = [
-                d for d in old_diffs
-                if isinstance(d, diff.Relocation)]
-        non_file_relos = [
-                d for d in relos if not isinstance(d, diff.BaseTasksFileDiff)]
-        all_relos = {(d.previous_location, d.new_location) for d in relos}
-
-        new_diffs = list(old_diffs)
+        # redundant), and the locations of all relocations, in one pass.
+        non_file_relos: List[diff.Relocation] = []
+        all_relos: Set[Tuple[object, object]] = set()
+        for d in old_diffs:
+            if not isinstance(d, diff.Relocation):
+                continue
+            all_relos.add((d.previous_location, d.new_location))
+            if not isinstance(d, diff.BaseTasksFileDiff):
+                non_file_relos.append(d)
 
-        def parent_path(path: str) -> str:
+        def split_path(path: str) -> Tuple[str, str]:
+            # Split into the parent's path and the last component.
             # Could throw, but shouldn't get a filename
             file_end_idx = path.index('[')
-            parts = path[file_end_idx:].split('.')
-            assert parts, f'Got filename: {path}'
-            return path[:file_end_idx] + '.'.join(parts[:-1])
-
-        def self_path(path: str) -> str:
-            file_end_idx = path.index('[')
-            return path[file_end_idx:].split('.')[-1]
+            # File names can contain dots, so only look after the file name.
+            sep_idx = path.rfind('.', file_end_idx)
+            if sep_idx < 0:
+                return path[:file_end_idx], path[file_end_idx:]
+            return path[:sep_idx], path[sep_idx + 1:]
 
+        redundant_relos: Set[int] = set()
         for relo in non_file_relos:
-            prev = cast(str, relo.previous_location)
-            new = cast(str, relo.new_location)
-            parent_relo = (parent_path(prev), parent_path(new))
-            if parent_relo in all_relos and self_path(prev) == self_path(new):
+            prev_parent, prev_self = split_path(
+                    cast(str, relo.previous_location))
+            new_parent, new_self = split_path(cast(str, relo.new_location))
+            if (prev_parent, new_parent) in all_relos and prev_self == new_self:
                 # Parent was relocated, we haven't been relocated in the
                 # parent => This relocation is redundant
-                new_diffs.remove(relo)
+                redundant_relos.add(id(relo))
 
-        return new_diffs
+        return [d for d in old_diffs if id(d) not in redundant_relos]
 
 
 class AbstractBlock(
@@ -658,6 +726,17 @@ class AbstractBlock(
         ans_type=anspb.block.Block,
         extra_kws={'name', 'block', 'rescue', 'always', 'when'}
 ):
+    # Keywords of the block itself, i.e., without the task lists. Computed
+    # once per class instead of on each diff.
+    _own_interested_kw_names: ClassVar[KwList]
+    _own_misc_kw_names: ClassVar[KwList]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._own_interested_kw_names = (
+                cls._interested_kw_names - _TASK_LIST_NAMES)
+        cls._own_misc_kw_names = cls._misc_kw_names - _TASK_LIST_NAMES
+
     def __init__(
             self, *args: object, **kwargs: Any
     ) -> None:
@@ -668,6 +747,12 @@ class AbstractBlock(
                 chain(*(tl for tl in task_lists if tl is not None)))
         for task in self:
             task.parent = self  # type: ignore[assignment]
+        # Paths to the children, by identity. The first occurrence wins, like
+        # searching the task lists in order would.
+        self._child_paths: Dict[int, str] = {}
+        for cont_name in ('block', 'rescue', 'always'):
+            for idx, child in enumerate(getattr(self, cont_name) or ()):
+                self._child_paths.setdefault(id(child), f'{cont_name}[{idx}]')
 
     @classmethod
     def structure(cls: Type[AbstractBlock[_CTType, _CBType, Any]], obj: Any) -> AbstractBlock[_CTType, _CBType, Any]:
@@ -749,7 +834,7 @@ class AbstractBlock(
     def __repr__(self) -> str:
         r = f'{self.__class__.__name__} {{'
         kw_reprs: List[str] = []
-        for kw in self._interested_kw_names - {'block', 'rescue', 'always'}:
+        for kw in self._own_interested_kw_names:
             kw_reprs.append(f'{kw} = {pformat(getattr(self, kw))}; ')
         for kw in self._misc_kw_names:
             if kw in self.misc_keywords:
@@ -795,23 +880,19 @@ class AbstractBlock(
         self.gv_visit_children(g, 'rescue')
         self.gv_visit_children(g, 'always')
 
-    @property
+    @cached_property
     def id(self) -> str:
+        # Cached, the tree isn't modified after it's been constructed, and IDs
+        # are needed for every diff of this block and its descendants.
         if isinstance(self.parent, AbstractBlock):
             return self.parent.id + '.' + self.parent.get_path_to(self)
         assert isinstance(self.parent, AbstractBlockFile)
-        return f'{self.parent.file_name}[{self.parent.index(self)}]'
+        return self.parent.get_path_to(self)
 
     def get_path_to(self, child: mixins.ObjectWithParentType) -> str:
-        if child in self.block:
-            cont_name = 'block'
-        elif child in self.rescue:
-            cont_name = 'rescue'
-        else:
-            assert child in self.always
-            cont_name = 'always'
-
-        return f'{cont_name}[{getattr(self, cont_name).index(child)}]'
+        path = self._child_paths.get(id(child))
+        assert path is not None
+        return path
 
     def similarity_score(self: _ABType, other: _ABType) -> float:
         if not isinstance(other, type(self)):
@@ -830,11 +911,8 @@ class AbstractBlock(
     def _diff_self(
             self: _ABType, other: _ABType
     ) -> Sequence[diff_mod.Diff]:
-        interested_kws = (
-                self._interested_kw_names - {'block', 'rescue', 'always'})
-        misc_kws = (
-                self._misc_kw_names - {'block', 'rescue', 'always'})
-        kws = (interested_kws | misc_kws)
+        interested_kws = self._own_interested_kw_names
+        misc_kws = self._own_misc_kw_names
         attrs1 = {
                 kw: getattr(self, kw) for kw in interested_kws}
         attrs1.update({
@@ -847,7 +925,7 @@ class AbstractBlock(
                 if kw in other.misc_keywords})
 
         # Remove unchanged kws
-        for kw in kws:
+        for kw in chain(interested_kws, misc_kws):
             if kw in attrs1 and kw in attrs2 and attrs1[kw] == attrs2[kw]:
                 del attrs1[kw]
                 del attrs2[kw]
@@ -856,7 +934,7 @@ class AbstractBlock(
             # Edit has taken place
             edit_t = cast(
                 Type[diff.Edit],
-                getattr(diff, self.__class__.__name__ + 'Edit'))
+                _diff_type(type(self), 'Edit'))
             return [edit_t(
                     obj_id=self.id, prev_val=attrs1, new_val=attrs2)]
 
@@ -899,9 +977,9 @@ class AbstractBlock(
     ) -> Sequence[diff_mod.Diff]:
         relocation_t = cast(
                 Type[diff.Relocation],
-                getattr(diff, cls.__name__ + 'Relocation'))
-        addition_t = getattr(diff, cls.__name__ + 'Addition')
-        removal_t = getattr(diff, cls.__name__ + 'Removal')
+                _diff_type(cls, 'Relocation'))
+        addition_t = _diff_type(cls, 'Addition')
+        removal_t = _diff_type(cls, 'Removal')
 
         return super()._match_relocations_internal(
                 old_diffs, addition_t, removal_t,
@@ -921,10 +999,10 @@ class AbstractBlock(
     def create_additions(self) -> Sequence[diff_mod.Addition]:
         block_addition_t = cast(
                 Type[diff.Addition],
-                getattr(diff, self.__class__.__name__ + 'Addition'))
+                _diff_type(type(self), 'Addition'))
         task_addition_t = cast(
                 Type[diff.Addition],
-                getattr(diff, self._get_task_type().__name__ + 'Addition'))
+                _diff_type(self._get_task_type(), 'Addition'))
 
         adds: List[diff.Addition] = []
         adds.append(block_addition_t(obj_id=self.id, add_val=self))
@@ -939,10 +1017,10 @@ class AbstractBlock(
     def create_removals(self) -> Sequence[diff_mod.Removal]:
         block_removal_t = cast(
                 Type[diff.Removal],
-                getattr(diff, self.__class__.__name__ + 'Removal'))
+                _diff_type(type(self), 'Removal'))
         task_removal_t = cast(
                 Type[diff.Removal],
-                getattr(diff, self._get_task_type().__name__ + 'Removal'))
+                _diff_type(self._get_task_type(), 'Removal'))
 
         rems: List[diff.Removal] = []
         rems.append(block_removal_t(obj_id=self.id, rem_val=self))
@@ -961,7 +1039,7 @@ class AbstractBlock(
     ) -> Sequence[diff_mod.Diff]:
         block_relocation_t = cast(
                 Type[diff.Relocation],
-                getattr(diff, cls.__name__ + 'Relocation'))
+                _diff_type(cls, 'Relocation'))
 
         return super()._diff_multiple_internal(
                 blocks1, blocks2,  # type: ignore[arg-type]
@@ -988,6 +1066,13 @@ class AbstractTask(
         base.BaseTask,
         ans_type=anspb.task.Task,
         extra_kws={'name', 'args', 'action', 'loop', 'loop_control', 'when'}):
+    # All keywords of the task, computed once per class instead of on each
+    # diff.
+    _all_kw_names: ClassVar[KwList]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._all_kw_names = cls._interested_kw_names | cls._misc_kw_names
 
     def gv_visit(self, g: SMGraph) -> None:
         g.add_node(self, '')
@@ -1019,9 +1104,8 @@ class AbstractTask(
         if not isinstance(other, type(self)):
             raise NotImplementedError
 
-        edit_t = getattr(diff, self.__class__.__name__ + 'Edit')
+        edit_t = _diff_type(type(self), 'Edit')
 
-        all_kws = self._interested_kw_names | self._misc_kw_names
         attrs1 = {
                 kw: getattr(self, kw) for kw in self._interested_kw_names}
         attrs1.update({
@@ -1034,7 +1118,7 @@ class AbstractTask(
                 if kw in other.misc_keywords})
 
         # Remove unchanged kws
-        for kw in all_kws:
+        for kw in self._all_kw_names:
             if kw in attrs1 and kw in attrs2 and attrs1[kw] == attrs2[kw]:
                 del attrs1[kw]
                 del attrs2[kw]
@@ -1054,13 +1138,13 @@ class AbstractTask(
     ) -> Sequence[diff_mod.Diff]:
         task_relocation_t = cast(
                 Type[diff.Relocation],
-                getattr(diff, cls.__name__ + 'Relocation'))
+                _diff_type(cls, 'Relocation'))
         task_addition_t = cast(
                 Type[diff.Addition],
-                getattr(diff, cls.__name__ + 'Addition'))
+                _diff_type(cls, 'Addition'))
         task_removal_t = cast(
                 Type[diff.Removal],
-                getattr(diff, cls.__name__ + 'Removal'))
+                _diff_type(cls, 'Removal'))
 
         return super()._diff_multiple_internal(
                 tasks1, tasks2,  # type: ignore[arg-type]
@@ -1086,9 +1170,9 @@ class AbstractTask(
     ) -> Sequence[diff_mod.Diff]:
         relocation_t = cast(
                 Type[diff.Relocation],
-                getattr(diff, cls.__name__ + 'Relocation'))
-        addition_t = getattr(diff, cls.__name__ + 'Addition')
-        removal_t = getattr(diff, cls.__name__ + 'Removal')
+                _diff_type(cls, 'Relocation'))
+        addition_t = _diff_type(cls, 'Addition')
+        removal_t = _diff_type(cls, 'Removal')
 
         return super()._match_relocations_internal(
                 old_diffs, addition_t, removal_t,
@@ -80,7 +80,9 @@ class DiffableMixin:
         sims = [
             (c1, c2, sim * (.75 if is_relocated(c1, c2) else 1))
             for c1, c2, sim in sims]
-        sims = sorted(sims[::-1], key=itemgetter(2), reverse=True)
+        # See _diff_multiple_internal
+        sims.reverse()
+        sims.sort(key=itemgetter(2), reverse=True)
 
         todo1 = set(children1)
         todo2 = set(children2)
@@ -121,8 +123,9 @@ class DiffableMixin:
         # which also reverses that stable order so that the farthest two
         # candidates are first. Hence, we reverse the candidates, which puts
         # the closest candidates last, then sort in reverse order, which places
-        # the closest two first again.
-        sims = sorted(sims[::-1], key=itemgetter(2), reverse=True)
+        # the closest two first again. Both are done in place.
+        sims.reverse()
+        sims.sort(key=itemgetter(2), reverse=True)
 
         # TODO: This can perhaps be optimized a bit by assuming a prefix of the
         # given lists matches, and checking relocations similar to how its done
@@ -565,7 +568,7 @@ class StructuralRoleEvolution(Model):
 
     @classmethod
     def load(cls, role_id: str, file_path: Path) -> StructuralRoleEvolution:
-        data = yaml.load(file_path.read_text(), Loader=Loader)
+        data = yaml.load(file_path.read_bytes(), Loader=Loader)
         return cls(role_id, [DiffSet.structure(diff_set) for diff_set in data['diff_sets']])
 
     def dump(self, dirpath: Path) -> Path:
@@ -590,4 +590,4 @@ class _LazyProxy(MultiStructuralRoleModel):
         # Restructure each time. Inefficient if accessed multiple times, but
         # we'll only access it once when diffing and caching it would be pretty
         # bad for memory usage.
-        return CONVERTER.structure(yaml.load(self._file_path.read_text(), Loader=Loader), List[StructuralRoleModel])
+        return CONVERTER.structure(yaml.load(self._file_path.read_bytes(), Loader=Loader), List[StructuralRoleModel])
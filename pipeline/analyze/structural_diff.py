@@ -100,7 +100,7 @@ class StructuralDiff(
         repo_cache_dir.mkdir(exist_ok=True)
 
         try:
-            rdm = RepoDiffMetrics.from_json_str(repo_cache_file.read_text())
+            rdm = RepoDiffMetrics.from_json_str(repo_cache_file.read_bytes())
             if bump_pbar is not None:
                 bump_pbar.update(len(rdm.metric_map))
             return rdm
@@ -5,6 +5,7 @@ from typing import (
         cast, final, get_origin, get_args, TYPE_CHECKING)
 
 import collections.abc
+import concurrent.futures
 import json
 import operator
 
@@ -51,6 +52,9 @@ _converter.register_unstructure_hook(
         Model, operator.methodcaller('to_json_obj'))  # type: ignore[misc]
 
 
+_DUMP_WORKERS = 4
+
+
 class CacheMiss(Exception):
     """Raised on cache miss."""
 
@@ -220,11 +224,17 @@ class Stage(ABC, Generic[ResultType, ConfigType]):
         dataset_dir_path = self.config.output_directory / self.dataset_dir_name
         dataset_dir_path.mkdir(exist_ok=True, parents=True)
         index: Dict[str, str] = {}
-        for result_id in results:
+        # Dump in a couple of threads so that writing one result to disk
+        # overlaps with serializing the next.
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=_DUMP_WORKERS) as executor:
             # Don't catch OSErrors, need to be able to save the data.
-            cache_file_path = results[result_id].dump(dataset_dir_path)
-            index[result_id] = str(
-                    cache_file_path.relative_to(dataset_dir_path))
+            cache_file_paths = executor.map(
+                    lambda result: result.dump(dataset_dir_path),
+                    results.values())
+            for result_id, cache_file_path in zip(results, cache_file_paths):
+                index[result_id] = str(
+                        cache_file_path.relative_to(dataset_dir_path))
 
         # Write the index
         with (dataset_dir_path / 'index.yaml').open('wt') as f_index:
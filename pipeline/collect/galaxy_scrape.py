@@ -1,14 +1,13 @@
 """Pipeline segment to collect raw API page responses from Ansible Galaxy."""
 from typing import Any, Dict, Iterator, List, Optional, Set, cast
 
-import json
-
 from pathlib import Path
 
 from tqdm import tqdm
 
 from config import MainConfig
 from models.galaxy import GalaxyAPIPage
+from models.serialize import json_dumps
 from pipeline.base import ResultMap, Stage
 from services.galaxy import GalaxyAPI
 
@@ -82,7 +81,7 @@ class GalaxyScrape(Stage[GalaxyAPIPage, MainConfig]):
         # Imitate the JSON of the role page.
         page_content = {'results': new_pages}
         results.append(GalaxyAPIPage(
-                'roles', highest_role_page_num + 1, json.dumps(page_content)))
+                'roles', highest_role_page_num + 1, json_dumps(page_content)))
 
         return results
 
@@ -2,7 +2,6 @@
 from typing import Iterable, List, Tuple, Optional, Iterator
 
 import git
-import pendulum
 
 from tqdm import tqdm
 
@@ -34,9 +33,8 @@ class ExtractGitMetadata(Stage[GitRepoMetadata, MainConfig], requires=Clone):
 
     def get_commits(self, repo_ref: git.Repo) -> List[GitCommit]:
         try:
-            return [GitCommit.from_git_commit(commit)
-                    for commit in repo_ref.iter_commits()]
-        except ValueError as e:
+            return GitCommit.batch_from_git_repo(repo_ref)
+        except git.GitCommandError as e:
             tqdm.write(f'{e}. Empty repo? {repo_ref}')
             return []
 
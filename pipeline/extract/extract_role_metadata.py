@@ -27,7 +27,7 @@ class ExtractRoleMetadata(
     ) -> ResultMap[GalaxyMetadata]:
         """Run the stage."""
         metadata_map = MetadataMap(list(galaxy_scrape._storage.values()))
-        metadata_map.verify_schema()
+        metadata_map.verify_schema(self.config.schema_sample)
 
         num_roles = cast(int, galaxy_scrape['roles/1'].response['count'])
 
@@ -43,6 +43,7 @@ class ExtractRoleMetadata(
                 'community_surveys', 'content', 'namespaces',
                 'provider_namespaces', 'repositories', 'roles', 'tags']
                 # 'users']
+        results['dummy'].preload()
         for attr in attrs:
             print(f'#{attr}: {len(getattr(results["dummy"], attr))}')
 
@@ -1,5 +1,6 @@
 """Anonymise the collected data, remove or obfuscate PII."""
 
+import json
 import yaml
 import sys
 from pathlib import Path
@@ -10,6 +11,20 @@ from yaml import CLoader as Loader, CDumper as Dumper
 
 assert __name__ == '__main__', 'Can only run this as script, not module'
 
+
+def load_data(path):
+    if path.suffix == '.json':
+        return json.loads(path.read_bytes())
+    return yaml.load(path.read_text(), Loader=Loader)
+
+
+def dump_data(path, data):
+    if path.suffix == '.json':
+        path.write_text(json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False))
+    else:
+        path.write_text(yaml.dump(data, Dumper=Dumper))
+
+
 dataset_path = Path(sys.argv[1])
 anon_path = dataset_path.with_name(dataset_path.name + '_anon')
 
@@ -22,30 +37,30 @@ for name, f in tqdm.tqdm(gm_idx.items()):
         continue
 
     if name == 'Namespace':
-        namespaces = yaml.load((gm / f).read_text(), Loader=Loader)
+        namespaces = load_data(gm / f)
         for namespace in namespaces.values():
             for attr in ('avatar_url', 'company_name', 'email', 'location'):
                 del namespace[attr]
-        (anon_path / 'GalaxyMetadata' / f).write_text(yaml.dump(namespaces, Dumper=Dumper))
+        dump_data(anon_path / 'GalaxyMetadata' / f, namespaces)
 
     elif name == 'ProviderNamespace':
-        pns = yaml.load((gm / f).read_text(), Loader=Loader)
+        pns = load_data(gm / f)
         for pn in pns.values():
             for attr in ('avatar_url', 'company_name', 'email', 'location', 'display_name'):
                 try:
                     del pn[attr]
                 except KeyError:
                     pass
-        (anon_path / 'GalaxyMetadata' / f).write_text(yaml.dump(pns, Dumper=Dumper))
+        dump_data(anon_path / 'GalaxyMetadata' / f, pns)
 
     elif name == 'Role':
-        roles = yaml.load((gm / f).read_text(), Loader=Loader)
+        roles = load_data(gm / f)
         for r in roles.values():
             try:
                 del r['company']
             except KeyError:
                 pass
-        (anon_path / 'GalaxyMetadata' / f).write_text(yaml.dump(roles, Dumper=Dumper))
+        dump_data(anon_path / 'GalaxyMetadata' / f, roles)
 
     else:
         (anon_path / 'GalaxyMetadata' / f).write_text((gm / f).read_text())
@@ -59,7 +74,7 @@ anon_rm = anon_path / 'RepositoryMetadata'
 for rid, mpath in tqdm.tqdm(rm_idx.items()):
     anon_path = anon_rm / mpath
     anon_path.parent.mkdir(exist_ok=True, parents=True)
-    content = yaml.load((rm / mpath).read_text(), Loader=Loader)
+    content = load_data(rm / mpath)
     for commit in content['commits']:
         for attr in ('author_email', 'author_name', 'committer_email', 'committer_name'):
             if commit[attr] is not None:
@@ -69,7 +84,7 @@ for rid, mpath in tqdm.tqdm(rm_idx.items()):
             if tag[attr] is not None:
                 tag[attr] = hashlib.sha1(tag[attr].encode()).hexdigest()
 
-    anon_path.write_text(yaml.dump(content, Dumper=Dumper))
+    dump_data(anon_path, content)
 
 repo_idx = yaml.load((dataset_path / 'Repositories' / 'index.yaml').read_text())
 new_idx = {gxy_id: rm_idx[repo_path] for gxy_id, repo_path in repo_idx.items()}
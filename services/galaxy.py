@@ -3,7 +3,6 @@ from typing import Callable, Dict, Iterator, Mapping, Optional, Sequence, Type,
 
 import enum
 import itertools
-import json
 import re
 import urllib.parse
 from json.decoder import JSONDecodeError
@@ -15,6 +14,7 @@ import tqdm
 from requests.exceptions import Timeout
 
 from models.galaxy import GalaxyAPIPage, GalaxyImportEventAPIResponse
+from models.serialize import json_loads
 
 
 def _log(text: str) -> None:
@@ -46,11 +46,12 @@ class GalaxyAPI:
     def _paginate(
             self, api_url: str,
             **params: Optional[str]
-    ) -> Iterator[str]:
+    ) -> Iterator[bytes]:
         """Paginate through the results of an Ansible Galaxy API query.
 
         Returns an iterable where new pages are lazily loaded. Requires the
-        API URL to return a 'results' field.
+        API URL to return a 'results' field. Pages are the raw response
+        content, so that they're decoded and parsed only once.
         """
         next_link: Optional[str]
         next_link = api_url + '?' + urllib.parse.urlencode(
@@ -66,7 +67,7 @@ class GalaxyAPI:
                 _log(f'{next_link}: Timed out')
                 continue
             try:
-                json = result.json()
+                page_json = json_loads(result.content)
             except JSONDecodeError:
                 # Ugly workaround for potential rate limiting. Sleep and retry
                 # with the same link
@@ -84,13 +85,13 @@ class GalaxyAPI:
                     page_num += 1
                     continue
 
-            if (next_path := json.get('next_link', None)) is not None:
+            if (next_path := page_json.get('next_link', None)) is not None:
                 next_link = 'https://galaxy.ansible.com' + next_path
             else:
                 # End of results
                 next_link = None
 
-            yield result.text
+            yield result.content
             page_num += 1
 
         _log(f'{api_url}: Done')
@@ -113,7 +114,7 @@ class GalaxyAPI:
             if result.status_code == 403:
                 # Forbidden
                 return None
-            return result.json()  # type: ignore[no-any-return]
+            return json_loads(result.content)  # type: ignore[no-any-return]
         except Timeout:
             # Try again with same link.
             _log(f'{role_id}: Timed out')
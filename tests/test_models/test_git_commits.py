@@ -0,0 +1,144 @@
+"""Tests for the GitCommit model."""
+from typing import List
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+import git
+import pytest
+
+from models.git import GitCommit, GitRepoMetadata
+from models.serialize import CONVERTER
+
+DT = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def test_missing_identity() -> None:
+    c = GitCommit(
+            sha1='abc', message='msg', authored_datetime=DT,
+            author_name='me', author_email=None, committed_datetime=DT,
+            committer_name=None, committer_email=None)
+
+    assert c.author_name == 'me'
+    assert c.author_email is None
+    assert c.committer_name is None
+    assert c.committer_email is None
+
+
+def test_structure_missing_identity() -> None:
+    c = CONVERTER.structure({
+        'sha1': 'abc', 'message': 'msg',
+        'authored_datetime': DT.isoformat(),
+        'author_name': 'me', 'author_email': None,
+        'committed_datetime': DT.isoformat(),
+        'committer_name': 'me', 'committer_email': None,
+    }, GitCommit)
+
+    assert c.author_email is None
+    assert c.committer_email is None
+    assert c.committed_datetime == DT
+
+
+def test_identities_interned() -> None:
+    name = ''.join(['m', 'e'])
+    c = GitCommit(
+            sha1='abc', message='msg', authored_datetime=DT,
+            author_name=name, author_email='me@example.com',
+            committed_datetime=DT, committer_name='me',
+            committer_email='me@example.com')
+
+    assert c.author_name is c.committer_name
+
+
+@pytest.fixture()
+def repo(tmp_path: Path) -> git.Repo:
+    repo = git.Repo.init(tmp_path)
+    with repo.config_writer() as cw:
+        cw.set_value('user', 'name', 'Me')
+        cw.set_value('user', 'email', 'me@example.com')
+    return repo
+
+
+def _commit(repo: git.Repo, message: str, **env: str) -> None:
+    repo.git.commit(
+            '--allow-empty', '--cleanup=verbatim', '-m', message, env=env)
+
+
+def _commit_raw(
+        repo: git.Repo, author: str, committer: str,
+        message: str = 'malformed\n', encoding: str = 'utf-8') -> None:
+    # Commit with identity lines that git itself would never write.
+    content = (
+            f'tree {repo.head.commit.tree.hexsha}\n'
+            f'parent {repo.head.commit.hexsha}\n'
+            f'author {author}\ncommitter {committer}\n\n{message}')
+    raw_file = Path(repo.git_dir) / 'raw_commit'
+    raw_file.write_bytes(content.encode(encoding))
+    sha1 = repo.git.hash_object('-t', 'commit', '-w', str(raw_file))
+    repo.git.update_ref('HEAD', sha1)
+
+
+def _assert_matches_gitpython(repo: git.Repo) -> List[GitCommit]:
+    commits = GitCommit.batch_from_git_repo(repo)
+
+    assert commits == [
+            GitCommit.from_git_commit(c) for c in repo.iter_commits()]
+    return commits
+
+
+def test_batch_messages(repo: git.Repo) -> None:
+    _commit(repo, 'first')
+    _commit(repo, 'subject\n\nbody\n\nmore body')
+    _commit(repo, 'trailing newlines\n\n\n')
+
+    commits = _assert_matches_gitpython(repo)
+
+    assert [c.message for c in commits] == [
+            'trailing newlines\n\n\n', 'subject\n\nbody\n\nmore body\n',
+            'first\n']
+
+
+def test_batch_identities(repo: git.Repo) -> None:
+    _commit(repo, 'first', GIT_AUTHOR_NAME='Other', GIT_AUTHOR_EMAIL='o@x')
+    _commit(repo, 'empty email', GIT_COMMITTER_EMAIL='')
+
+    commits = _assert_matches_gitpython(repo)
+
+    assert commits[1].author_name == 'Other'
+    assert commits[1].author_email == 'o@x'
+    assert commits[1].committer_name == 'Me'
+    assert commits[0].committer_email == ''
+
+
+def test_batch_missing_identities(repo: git.Repo) -> None:
+    _commit(repo, 'first')
+    _commit_raw(
+            repo, 'Nobody 1600000000 +0000', '<only@mail> 1600000000 +0000')
+    _commit(repo, 'last')
+
+    commits = _assert_matches_gitpython(repo)
+
+    assert commits[1].message == 'malformed\n'
+    assert commits[1].author_email is None
+    assert commits[0].message == 'last\n'
+
+
+def test_batch_non_utf8(repo: git.Repo, tmp_path: Path) -> None:
+    _commit(repo, 'first')
+    _commit_raw(
+            repo, 'J\xf6rg <j@x> 1600000000 +0000',
+            'J\xf6rg <j@x> 1600000000 +0000', message='Caf\xe9 fix\n',
+            encoding='latin-1')
+
+    commits = _assert_matches_gitpython(repo)
+
+    assert commits[0].author_name == 'J\ufffdrg'
+    assert commits[0].message == 'Caf\ufffd fix\n'
+    GitRepoMetadata(
+            commits=commits, tags=[], repo_owner='owner',
+            repo_name='name').dump(tmp_path / 'out')
+
+
+def test_batch_empty_repo(repo: git.Repo) -> None:
+    with pytest.raises(git.GitCommandError):
+        GitCommit.batch_from_git_repo(repo)
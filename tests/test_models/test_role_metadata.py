@@ -0,0 +1,224 @@
+"""Tests for models.role_metadata."""
+from typing import Callable
+
+import collections.abc
+import os
+import pickle
+
+from pathlib import Path
+
+import pytest
+import _pytest
+
+import models.role_metadata
+from models.role_metadata import GalaxyMetadata, MetadataMap, Tag, _LazyDict
+
+TAGS_JSON = '''{
+  "1": {
+    "creation_date": "2020-01-01T00:00:00Z",
+    "entity_id": 1,
+    "modification_date": "2020-01-02T00:00:00Z",
+    "name": "web"
+  },
+  "2": {
+    "creation_date": "2020-02-01T00:00:00Z",
+    "entity_id": 2,
+    "modification_date": "2020-02-02T00:00:00Z",
+    "name": "db"
+  }
+}'''
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(
+        tmp_path: Path, monkeypatch: _pytest.monkeypatch.MonkeyPatch
+) -> Path:
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setattr(models.role_metadata, '_CACHE_DIR', cache_dir)
+    return cache_dir
+
+
+@pytest.fixture()
+def tags_file(tmp_path: Path) -> Path:
+    dataset_dir = tmp_path / 'dataset'
+    dataset_dir.mkdir()
+    path = dataset_dir / 'Tags.json'
+    path.write_text(TAGS_JSON)
+    return path
+
+
+def test_load_dict(tags_file: Path) -> None:
+    tags = GalaxyMetadata._load_dict(tags_file, Tag)
+
+    assert sorted(tags) == [1, 2]
+    assert tags[2].name == 'db'
+    assert tags[1].creation_date.month == 1
+
+
+def test_structured_cache_outside_dataset(
+        tags_file: Path, cache_dir: Path
+) -> None:
+    GalaxyMetadata._load_dict(tags_file, Tag)
+
+    assert [p.name for p in tags_file.parent.iterdir()] == ['Tags.json']
+    assert len(list(cache_dir.glob('Tags-*.pickle'))) == 1
+
+
+def test_structured_cache_used(
+        tags_file: Path, monkeypatch: _pytest.monkeypatch.MonkeyPatch
+) -> None:
+    tags = GalaxyMetadata._load_dict(tags_file, Tag)
+    monkeypatch.setattr(
+            models.role_metadata, '_load_entity_file', pytest.fail)
+
+    assert GalaxyMetadata._load_dict(tags_file, Tag) == tags
+
+
+def test_structured_cache_stale_file(tags_file: Path) -> None:
+    GalaxyMetadata._load_dict(tags_file, Tag)
+    mtime_ns = tags_file.stat().st_mtime_ns
+    tags_file.write_text(TAGS_JSON.replace('"db"', '"sql"'))
+    # Only the size differs.
+    os.utime(tags_file, ns=(mtime_ns, mtime_ns))
+
+    assert GalaxyMetadata._load_dict(tags_file, Tag)[2].name == 'sql'
+
+
+def test_structured_cache_stale_schema(
+        tags_file: Path, monkeypatch: _pytest.monkeypatch.MonkeyPatch
+) -> None:
+    GalaxyMetadata._load_dict(tags_file, Tag)
+    monkeypatch.setattr(
+            models.role_metadata, '_get_schema_hash', lambda: 'changed')
+
+    assert models.role_metadata._load_structured_cache(tags_file) is None
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda key: b'garbage',
+    lambda key: pickle.dumps(key)[:-3],
+    # Entities referring to models that have since been removed.
+    lambda key: pickle.dumps(key) + b'cmodels.removed\nEntity\n.',
+])
+def test_structured_cache_unusable(
+        tags_file: Path, cache_dir: Path,
+        corrupt: Callable[[object], bytes]
+) -> None:
+    GalaxyMetadata._load_dict(tags_file, Tag)
+    cache, = cache_dir.glob('Tags-*.pickle')
+    key = models.role_metadata._get_structured_cache_key(tags_file)
+    cache.write_bytes(corrupt(key))
+
+    assert models.role_metadata._load_structured_cache(tags_file) is None
+    assert GalaxyMetadata._load_dict(tags_file, Tag)[2].name == 'db'
+
+
+def test_legacy_yaml_cache(
+        tmp_path: Path, cache_dir: Path,
+        monkeypatch: _pytest.monkeypatch.MonkeyPatch
+) -> None:
+    yaml_file = tmp_path / 'Tags.yaml'
+    yaml_file.write_text(TAGS_JSON)
+    models.role_metadata._load_entity_file(yaml_file)
+    monkeypatch.setattr(models.role_metadata.yaml, 'load', pytest.fail)
+    content = models.role_metadata._load_entity_file(yaml_file)
+
+    assert content['2']['name'] == 'db'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['Tags.yaml', 'cache']
+    assert len(list(cache_dir.glob('Tags-*.yaml.json'))) == 1
+
+
+@pytest.fixture()
+def lazy_tags(tags_file: Path) -> _LazyDict[Tag]:
+    return _LazyDict(tags_file, Tag)
+
+
+def test_lazy_dict_is_mapping(lazy_tags: _LazyDict[Tag]) -> None:
+    assert isinstance(lazy_tags, collections.abc.Mapping)
+
+
+def test_lazy_dict_loads_on_access(
+        lazy_tags: _LazyDict[Tag], tags_file: Path
+) -> None:
+    # Nothing is read until the first access.
+    tags_file.write_text(TAGS_JSON.replace('"db"', '"sql"'))
+
+    assert lazy_tags[2].name == 'sql'
+
+
+def test_lazy_dict_structures_per_key(
+        lazy_tags: _LazyDict[Tag]
+) -> None:
+    assert len(lazy_tags) == 2
+    assert list(lazy_tags) == [1, 2]
+    assert 1 in lazy_tags
+    assert '1' not in lazy_tags
+    assert 3 not in lazy_tags
+    assert not lazy_tags._structured
+
+    tag = lazy_tags[1]
+
+    assert tag.name == 'web'
+    assert tag.creation_date.month == 1
+    assert list(lazy_tags._structured) == [1]
+    assert lazy_tags[1] is tag
+
+
+def test_lazy_dict_get(lazy_tags: _LazyDict[Tag]) -> None:
+    assert lazy_tags.get(3) is None
+    assert lazy_tags.get(2) is lazy_tags[2]
+    with pytest.raises(KeyError):
+        lazy_tags[3]
+
+
+def test_lazy_dict_views(lazy_tags: _LazyDict[Tag]) -> None:
+    assert list(lazy_tags.keys()) == [1, 2]
+    assert [tag.name for tag in lazy_tags.values()] == ['web', 'db']
+    assert [(k, v.name) for k, v in lazy_tags.items()] == [
+            (1, 'web'), (2, 'db')]
+    assert len(lazy_tags.values()) == 2
+
+
+def test_lazy_dict_eq(lazy_tags: _LazyDict[Tag], tags_file: Path) -> None:
+    eager_tags = GalaxyMetadata._load_dict(tags_file, Tag)
+
+    assert lazy_tags == eager_tags
+    assert eager_tags == lazy_tags
+    assert lazy_tags == _LazyDict(tags_file, Tag)
+    assert lazy_tags != {1: eager_tags[1]}
+    assert lazy_tags != [1, 2]
+
+
+def test_lazy_dict_uses_structured_cache(
+        tags_file: Path, monkeypatch: _pytest.monkeypatch.MonkeyPatch
+) -> None:
+    tags = GalaxyMetadata._load_dict(tags_file, Tag)
+    monkeypatch.setattr(
+            models.role_metadata, '_load_entity_file', pytest.fail)
+    lazy_tags = _LazyDict(tags_file, Tag)
+
+    assert lazy_tags[2] == tags[2]
+    assert lazy_tags == tags
+
+
+def test_lazy_load(tags_file: Path) -> None:
+    dataset_dir = tags_file.parent
+    index = []
+    for etype_name in models.role_metadata._INDEX_ENTITY_TYPES:
+        if etype_name != 'Tag':
+            (dataset_dir / f'{etype_name}.json').write_text('{}')
+            index.append(f'{etype_name}: {etype_name}.json\n')
+    index.append('Tag: Tags.json\n')
+    (dataset_dir / 'index.yaml').write_text(''.join(index))
+    meta = GalaxyMetadata.lazy_load('dummy', dataset_dir)
+    meta.preload()
+
+    assert isinstance(meta.tags, _LazyDict)
+    assert not meta.roles
+    assert meta.tags[1].name == 'web'
+
+
+@pytest.mark.parametrize('sample', [-0.5, 1.5])
+def test_verify_schema_sample_out_of_range(sample: float) -> None:
+    with pytest.raises(ValueError, match='between 0 and 1'):
+        MetadataMap([]).verify_schema(sample)
@@ -0,0 +1,45 @@
+"""Tests for serialization utilities."""
+from pathlib import Path
+
+import pytest
+import _pytest
+
+import models.serialize
+from models.serialize import json_dumps, json_load_file, json_loads
+
+DATA = {'b': [1, 2.5, None], 'a': {'nested': 'välue', 'flag': True}}
+
+
+@pytest.fixture(params=[True, False], ids=['orjson', 'stdlib'])
+def json_backend(
+        request: _pytest.fixtures.SubRequest,
+        monkeypatch: _pytest.monkeypatch.MonkeyPatch
+) -> None:
+    """Run with and without orjson."""
+    if request.param:
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(models.serialize, 'orjson', None)
+
+
+@pytest.mark.usefixtures('json_backend')
+def test_json_roundtrip() -> None:
+    assert json_loads(json_dumps(DATA)) == DATA
+    assert json_loads(json_dumps(DATA).decode()) == DATA
+
+
+@pytest.mark.usefixtures('json_backend')
+def test_json_dumps_pretty() -> None:
+    dumped = json_dumps(DATA, pretty=True).decode()
+
+    assert dumped.startswith('{\n  "a": {\n    "flag": true,')
+    assert 'välue' in dumped
+    assert json_loads(dumped) == DATA
+
+
+@pytest.mark.usefixtures('json_backend')
+def test_json_load_file(tmp_path: Path) -> None:
+    fpath = tmp_path / 'data.json'
+    fpath.write_bytes(json_dumps(DATA, pretty=True))
+
+    assert json_load_file(fpath) == DATA
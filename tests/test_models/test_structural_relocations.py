@@ -0,0 +1,135 @@
+"""Tests for relocation matching in structural block file diffs."""
+from typing import Any, Dict, List, Sequence, Tuple, Type
+
+import pytest
+
+from models.structural import diff
+from models.structural.abstract import AbstractBlockFile
+from models.structural.role import HandlerFile, TaskFile
+
+
+def task(name: str, action: str) -> Dict[str, Any]:
+    return {'name': name, 'action': action, 'args': {'msg': name}}
+
+
+def block(name: str, *tasks: Dict[str, Any]) -> Dict[str, Any]:
+    return {'name': name, 'block': list(tasks), 'rescue': [], 'always': []}
+
+
+_FileType = Type[AbstractBlockFile[Any]]
+
+
+def block_file(
+        file_type: _FileType, file_name: str, *blocks: Dict[str, Any]
+) -> AbstractBlockFile[Any]:
+    return file_type.structure(  # type: ignore[attr-defined, no-any-return]
+            {'file_name': file_name, 'content': list(blocks)})
+
+
+def summarize(diffs: Sequence[diff.Diff]) -> List[Tuple[str, ...]]:
+    summary: List[Tuple[str, ...]] = []
+    for d in diffs:
+        if isinstance(d, diff.Relocation):
+            summary.append((
+                    type(d).__name__, str(d.previous_location),
+                    str(d.new_location)))
+        else:
+            summary.append((type(d).__name__, str(d.object_id)))
+    return summary
+
+
+@pytest.mark.parametrize('file_type, task_relocation', [
+    (TaskFile, 'TaskRelocation'),
+    (HandlerFile, 'HandlerTaskRelocation')])
+def test_task_relocated_between_files(
+        file_type: _FileType, task_relocation: str
+) -> None:
+    v1 = [
+        block_file(file_type, 'main.yml', block(
+            'x', task('a', 'apt'), task('b', 'copy'), task('c', 'file'))),
+        block_file(file_type, 'other.yml', block(
+            'y', task('d', 'git'), task('e', 'pip')))]
+    v2 = [
+        block_file(file_type, 'main.yml', block(
+            'x', task('a', 'apt'), task('b', 'copy'))),
+        block_file(file_type, 'other.yml', block(
+            'y', task('d', 'git'), task('e', 'pip'), task('c', 'file')))]
+
+    diffs = file_type.diff_multiple(v1, v2)
+
+    assert summarize(diffs) == [
+            (task_relocation, 'main.yml[0].block[2]', 'other.yml[0].block[2]')]
+
+
+def test_task_relocated_between_blocks() -> None:
+    v1 = [block_file(
+            TaskFile, 'main.yml',
+            block('x', task('a', 'apt'), task('b', 'copy'), task('c', 'file')),
+            block('y', task('d', 'git'), task('e', 'pip')))]
+    v2 = [block_file(
+            TaskFile, 'main.yml',
+            block('x', task('a', 'apt'), task('b', 'copy')),
+            block(
+                'y', task('d', 'git'), task('e', 'pip'), task('c', 'file')))]
+
+    diffs = TaskFile.diff_multiple(v1, v2)
+
+    assert summarize(diffs) == [
+            ('TaskRelocation', 'main.yml[0].block[2]', 'main.yml[1].block[2]')]
+
+
+def test_block_relocated_between_files() -> None:
+    # The tasks of the relocated block aren't reported as relocated as well.
+    v1 = [
+        block_file(
+            TaskFile, 'main.yml',
+            block('x', task('a', 'apt'), task('b', 'copy')),
+            block('z', task('z', 'yum'))),
+        block_file(TaskFile, 'other.yml', block('y', task('d', 'git')))]
+    v2 = [
+        block_file(TaskFile, 'main.yml', block('z', task('z', 'yum'))),
+        block_file(
+            TaskFile, 'other.yml',
+            block('y', task('d', 'git')),
+            block('x', task('a', 'apt'), task('b', 'copy')))]
+
+    diffs = TaskFile.diff_multiple(v1, v2)
+
+    assert summarize(diffs) == [
+            ('BlockRelocation', 'main.yml[1]', 'main.yml[0]'),
+            ('BlockRelocation', 'main.yml[0]', 'other.yml[1]')]
+
+
+def test_relocated_block_is_diffed() -> None:
+    # Task diffs in relocated blocks are matched along with the others.
+    v1 = [block_file(
+            TaskFile, 'main.yml',
+            block('x', task('a', 'apt'), task('b', 'copy'), task('c', 'file')),
+            block('z', task('z', 'yum')))]
+    v2 = [block_file(
+            TaskFile, 'main.yml',
+            block('z', task('z', 'yum')),
+            block(
+                'x', task('a', 'apt'), task('c', 'file'), task('b', 'copy')))]
+
+    diffs = TaskFile.diff_multiple(v1, v2)
+
+    assert summarize(diffs) == [
+            ('BlockRelocation', 'main.yml[1]', 'main.yml[0]'),
+            ('BlockRelocation', 'main.yml[0]', 'main.yml[1]'),
+            ('TaskRelocation', 'main.yml[0].block[2]', 'main.yml[1].block[1]'),
+            ('TaskRelocation', 'main.yml[0].block[1]', 'main.yml[1].block[2]')]
+
+
+def test_file_diffs_are_kept() -> None:
+    v1 = [block_file(TaskFile, 'main.yml', block('x', task('a', 'apt')))]
+    v2 = [
+        block_file(TaskFile, 'main.yml', block('x', task('a', 'apt'))),
+        block_file(TaskFile, 'new.yml', block('n', task('n', 'git')))]
+
+    diffs = TaskFile.diff_multiple(v1, v2)
+
+    assert summarize(diffs) == [
+            ('TaskFileAddition', 'new.yml'),
+            ('BlockAddition', 'new.yml[0]'),
+            ('TaskAddition', 'new.yml[0].block[0]')]
@@ -6,6 +6,7 @@ from pathlib import Path
 import click
 import pytest
 
+from config import ExtractRoleMetadataConfig, MainConfig
 from util.config import Config, Option
 
 HELP_TEXT_BOOL = 'Help text for test option'
@@ -197,3 +198,24 @@ def test_get_attr_name_nonexistent() -> None:
 
     with pytest.raises(TypeError):
         o._get_attr_name(c)
+
+
+def test_output_directory_follows_options() -> None:
+    parent = MainConfig()
+    parent.dataset = 'first'
+    c = MainConfig(parent)
+
+    assert c.output_directory == Path('data', 'first')
+
+    parent.output = Path('elsewhere')
+
+    assert c.output_directory == Path('elsewhere', 'first')
+
+
+def test_schema_sample_range() -> None:
+    click_type = ExtractRoleMetadataConfig.schema_sample.click_type
+    assert click_type is not None
+
+    assert click_type.convert('0.5', None, None) == 0.5
+    with pytest.raises(click.BadParameter):
+        click_type.convert('1.5', None, None)
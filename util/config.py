@@ -95,27 +95,30 @@ class Option(Generic[_OptionType]):
         if obj is None:
             return self
 
-        if obj not in self._value_map:
-            if obj._parent_cfg is not None:
-                try:
-                    return self.__get__(
-                            obj._parent_cfg, obj._parent_cfg.__class__)
-                except TypeError:
-                    pass
-            if self.default is not None:
-                return self.default
-            if self.default_factory is not None:
-                default = self.default_factory()
-                self._value_map[obj] = default
-                return default
-            if not self.required:
-                return None  # type: ignore[return-value]
-
-            raise click.BadParameter(
-                    'This option is required.',
-                    param_hint=f'--{self._get_attr_name(obj)}')
-
-        return self._value_map[obj]
+        try:
+            return self._value_map[obj]
+        except KeyError:
+            # Not set on this object, fall back to the parent and defaults.
+            pass
+
+        if obj._parent_cfg is not None:
+            try:
+                return self.__get__(
+                        obj._parent_cfg, obj._parent_cfg.__class__)
+            except TypeError:
+                pass
+        if self.default is not None:
+            return self.default
+        if self.default_factory is not None:
+            default = self.default_factory()
+            self._value_map[obj] = default
+            return default
+        if not self.required:
+            return None  # type: ignore[return-value]
+
+        raise click.BadParameter(
+                'This option is required.',
+                param_hint=f'--{self._get_attr_name(obj)}')
 
     def __set__(self, obj: _ConfigType, value: _OptionType) -> None:
         """Set part of the descriptor protocol."""